@@ -140,6 +140,24 @@ class P3_Reverse:
 
         return cls.swap_reverse(x, 0, size)
 
+    @staticmethod
+    def permute_reverse(x, start=0, end=None):
+        """
+        Return x with bits from start (inclusive) to end (exclusive) reversed
+        by permuting the bits with bitmanip.permute_bits().
+
+        The reversal is compiled once into a few delta swaps (log2(end)
+        for a power of 2 range), each of which swaps many pairs of bits at
+        once, instead of swapping one pair at a time.
+        """
+
+        if (end == None):
+            end = x.bit_length()
+
+        permutation = list(range(end))
+        permutation[start:end] = reversed(permutation[start:end])
+        return bitmanip.permute_bits(x, permutation)
+
     _cache = []
     _cache_bit_size = 16
     _cache_filled = False
@@ -418,7 +436,7 @@ class P5_1_Subsets:
             subsets.add(subset)
             if (output):
                 print(subset)
-            i = bitmanip.same_bits_up(i)
+            i = bitmanip.same_bits_up_gosper(i)
         return subsets
 
     @staticmethod
@@ -902,53 +920,85 @@ class P10_GreatestCommonDivisor:
     def greatest_common_divisor(x, y):
         """
         Returns the greatest common divisor of x and y iteratively.
+        """
+
+        return mathextra.greatest_common_divisor(x, y)
 
-        This works by using Euclid's algorithm as shown in the else case
-        and in the if case when (y == 0). The code keeps x > y.
-        There are some optimizations to Euclid's algorithm by checking
-        when x and y are even.
-        If both x and y are even, you can divide
-        them both by 2 (right shift 1) and multiply the final answer
-        by 2 (left shift 1).
-        If only one is even, you can divide that one by 2 because
-        2 is not a factor of the GCD since the other number isn't
-        divisible by 2. When x is the even one (and y is odd),
-        x gets divided by 2 so you have to check if x is still > y,
-        otherwise you swap them.
-        If they are both odd, follow with the Euclid's alogirthm,
-        which is "The GCD of two numbers does not change if the larger
-        number is replaced by its difference with the smaller number".
-        You have to check if x and y need to be swapped in this case
-        as well, to keep x > y.
+    @staticmethod
+    def greatest_common_divisor_binary(x, y):
+        """
+        Returns the greatest common divisor of x and y, shifting out all
+        trailing 0's at once instead of one per iteration.
         """
 
-        if (x < y):
-            x, y = y, x
+        return mathextra.greatest_common_divisor_binary(x, y)
 
-        shift_multiplier = 0
-        while (True):
-            if (y == 0):
-                return x << shift_multiplier
-
-            x_is_even = mathextra.is_even(x)
-            x_is_odd = not x_is_even
-            y_is_even = mathextra.is_even(y)
-            y_is_odd = not y_is_even
-
-            if (x_is_even and y_is_even):
-                x >>= 1
-                y >>= 1
-                shift_multiplier += 1
-            elif (x_is_odd and y_is_even):
-                y >>= 1
-            elif (x_is_even and y_is_odd):
-                x >>= 1
-                if (x < y):
-                    x, y = y, x
-            else:
-                x -= y
-                if (x < y):
-                    x, y = y, x
+    @staticmethod
+    def greatest_common_divisor_lehmer(x, y):
+        """
+        Returns the greatest common divisor of x and y using Lehmer's
+        algorithm for multi-word x and y.
+        """
+
+        return mathextra.greatest_common_divisor_lehmer(x, y)
+
+    @staticmethod
+    def gcd_many(values):
+        """
+        Returns the greatest common divisor of all of values.
+        """
+
+        return mathextra.gcd_many(values)
+
+    @staticmethod
+    def lcm_many(values):
+        """
+        Returns the least common multiple of all of values.
+        """
+
+        return mathextra.lcm_many(values)
+
+    @staticmethod
+    def gcd_each(x, values):
+        """
+        Returns the greatest common divisor of x and each of values.
+        """
+
+        return mathextra.gcd_each(x, values)
+
+    @staticmethod
+    def batch_gcd(values):
+        """
+        Returns the greatest common divisor of each of values and the
+        product of the other values.
+        """
+
+        return mathextra.batch_gcd(values)
+
+    @staticmethod
+    def extended_gcd(x, y):
+        """
+        Returns (g, s, t) where g is the greatest common divisor of x and
+        y and s * x + t * y == g.
+        """
+
+        return mathextra.extended_gcd(x, y)
+
+    @staticmethod
+    def mod_inverse(a, m):
+        """
+        Returns the inverse of a mod m.
+        """
+
+        return mathextra.mod_inverse(a, m)
+
+    @staticmethod
+    def batch_mod_inverse(values, m):
+        """
+        Returns the inverse mod m of each of values with one inversion.
+        """
+
+        return mathextra.batch_mod_inverse(values, m)
 
 class P11_GeneratePrimes:
     """
@@ -972,6 +1022,24 @@ class P11_GeneratePrimes:
 
         return list(cls.generate_primes(n))
 
+    @staticmethod
+    def generate_primes_cached(n):
+        """
+        Return a generator of prime numbers from [1, n]. The sieve is
+        shared between calls so only numbers larger than any previous n
+        get sieved.
+        """
+
+        return mathextra.generate_primes_cached(n)
+
+    @classmethod
+    def generate_primes_cached_list(cls, n):
+        """
+        Return a list of prime numbers from [1, n] using the shared sieve.
+        """
+
+        return list(cls.generate_primes_cached(n))
+
 class P12_XyRectanglesIntersect:
     """
     Let R and S be xy-aligned rectangles in the Cartesian plane. Write a
@@ -999,6 +1067,61 @@ class P12_XyRectanglesIntersect:
 
         return R.intersection(S)
 
+    @staticmethod
+    def intersects_many(R, S):
+        """
+        Return a bytes with 1 where R[i] intersects with S[i], else 0.
+        R and S are mathextra.RectangleArray or sequences of Rectangles of
+        the same length. S can also be a single Rectangle.
+
+        The comparisons are done a column at a time with
+        mathextra.RectangleArray.intersects_many() instead of calling
+        intersects() for each pair.
+        """
+
+        R = mathextra.RectangleArray.as_rectangle_array(R)
+        if (not isinstance(S, mathextra.Rectangle)):
+            S = mathextra.RectangleArray.as_rectangle_array(S)
+        return R.intersects_many(S)
+
+    @staticmethod
+    def intersection_many(R, S):
+        """
+        Return a mathextra.RectangleArray of the intersection of R[i]
+        and S[i], where R[i] and S[i] that don't intersect give None.
+        R and S are like intersects_many().
+        """
+
+        R = mathextra.RectangleArray.as_rectangle_array(R)
+        if (not isinstance(S, mathextra.Rectangle)):
+            S = mathextra.RectangleArray.as_rectangle_array(S)
+        return R.intersection_many(S)
+
+    @staticmethod
+    def intersects_matrix(R, S):
+        """
+        Return a list of bytearrays where answer[i][j] is 1 if R[i]
+        intersects with S[j], else 0. R and S are
+        mathextra.RectangleArray or sequences of Rectangles.
+        """
+
+        R = mathextra.RectangleArray.as_rectangle_array(R)
+        return R.intersects_matrix(S)
+
+    @staticmethod
+    def find_intersecting_pairs(rectangles):
+        """
+        Return a list of every pair (i, j), i < j, where rectangles[i]
+        intersects with rectangles[j], with the same touching semantics as
+        intersects().
+
+        Instead of calling intersects() for all O(N^2) pairs, this sweeps
+        across x with mathextra.find_intersecting_pairs(), which is
+        O((N + K) log N) for K pairs.
+        """
+
+        return mathextra.find_intersecting_pairs(rectangles)
+
 class P12_1_IsRectangle:
     """
     Given four points in the plane, check if they are vertices of a
@@ -1046,18 +1169,32 @@ class P13_MultiplicationBitwise:
 
         return bitmanip.multiply_bitwise(x, y)
 
+    @staticmethod
+    def multiply_bitwise_karatsuba(x, y,
+            threshold=bitmanip.KARATSUBA_MULTIPLY_THRESHOLD):
+        """
+        Return the product of x and y using Karatsuba multiplication for
+        operands wider than threshold bits, still only using assignment,
+        bitwise operators, loops, and conditionals.
+        """
+
+        return bitmanip.multiply_bitwise_karatsuba(x, y, threshold)
+
 class P14_FloorDivision:
     """
     Given two positive integers, compute x // y if the only operators you
     can use are addition, subtraction, and multiplication.
     """
 
-    @staticmethod
-    def floordiv_bitwise(x, y):
+    @classmethod
+    def floordiv_bitwise(cls, x, y):
         """
         Return x // y (both positive integers) using only
         addition, subtraction, multiplication, and bitwise operations.
 
+        The loops are in divmod_bitwise(), which also returns the
+        remainder.
+
         This works by finding the highest 2**k * y (where k is a whole
         number) to subtract from x multiple times until
         x < y (the remainder). In effect, this is building a binary number
@@ -1107,11 +1244,23 @@ class P14_FloorDivision:
         >>>>>>>
         """
 
+        return cls.divmod_bitwise(x, y)[0]
+
+    @staticmethod
+    def divmod_bitwise(x, y):
+        """
+        Return (x // y, x % y) (both positive integers) using only
+        addition, subtraction, multiplication, and bitwise operations.
+
+        This is floordiv_bitwise(). Every subtraction takes a multiple of
+        y off of x, so the x left at the end is the remainder.
+        """
+
         if (y == 0):
             raise ZeroDivisionError("integer division by 0")
 
         if (x < y):
-            return 0
+            return 0, x
 
         highest_power = 1
         while (True):
@@ -1130,4 +1279,101 @@ class P14_FloorDivision:
                 x -= subtract_amount
                 answer += 1 << power
             power -= 1
-        return answer
+        return answer, x
+
+    NEWTON_THRESHOLD = 1 << 6
+
+    @classmethod
+    def _reciprocal(cls, v, precision):
+        """
+        Return r ~= 2**(2 * precision) / v where v has exactly precision
+        bits. r is within a few units of the exact value.
+
+        This is Newton's method for 1 / v with precision doubling. Only
+        the top half of v is needed to get the top half of r, so r is
+        first found for the top half of v recursively, then shifted up
+        to full precision, which leaves it correct to about half of its
+        bits. One Newton step
+        r += r * (2**(2 * precision) - v * r) / 2**(2 * precision)
+        squares the relative error, which doubles the correct bits. The
+        division by 2**(2 * precision) is a shift. The extra 2 bits in
+        half_precision cover the error from cutting v in half.
+
+        Each level multiplies numbers half the size of the level above,
+        so the whole reciprocal costs a small constant times one
+        precision-bit multiplication.
+        """
+
+        if (precision <= cls.NEWTON_THRESHOLD):
+            return cls.divmod_bitwise(1 << (precision << 1), v)[0]
+
+        half_precision = (precision >> 1) + 2
+        shift = precision - half_precision
+        r = cls._reciprocal(v >> shift, half_precision) << shift
+
+        error = (1 << (precision << 1)) - v * r
+        return r + ((r * error) >> (precision << 1))
+
+    @classmethod
+    def divmod_newton(cls, x, y):
+        """
+        Return (x // y, x % y) (both positive integers) using only
+        addition, subtraction, multiplication, and bitwise operations.
+
+        The shift and subtract loops in divmod_bitwise() find one bit of
+        the quotient per iteration with a subtraction as wide as x, so
+        they take O(bits(x) * bits(quotient)) time. This multiplies by
+        a reciprocal of y instead:
+        x // y ~= (x * (2**k / y)) >> k
+        The quotient has at most quotient_bits bits, so 2**k / y only
+        needs that many correct bits (plus a few guard bits), and only
+        that many of the top bits of y matter. The reciprocal comes from
+        _reciprocal() and is off by a few units at most, so the estimated
+        quotient is too, and the remainder x - quotient * y is fixed up
+        by adding or subtracting y a few times.
+
+        This takes a few multiplications of quotient_bits-bit numbers,
+        so it scales to dividends of 100000+ bits.
+        """
+
+        if (y == 0):
+            raise ZeroDivisionError("integer division by 0")
+
+        if (x < y):
+            return 0, x
+
+        y_bits = y.bit_length()
+        quotient_bits = x.bit_length() - y_bits + 1
+        precision = quotient_bits + 4
+
+        # v is the top precision bits of y. y ~= v << shift (shift can be
+        # negative if y is shorter than precision).
+        shift = y_bits - precision
+        if (shift >= 0):
+            v = y >> shift
+        else:
+            v = y << -shift
+
+        # 2**(2 * precision) / v ~= 2**(y_bits + precision) / y
+        reciprocal = cls._reciprocal(v, precision)
+        quotient = (x * reciprocal) >> (y_bits + precision)
+
+        remainder = x - quotient * y
+        while (remainder < 0):
+            quotient -= 1
+            remainder += y
+        while (remainder >= y):
+            quotient += 1
+            remainder -= y
+        return quotient, remainder
+
+    @classmethod
+    def floordiv_newton(cls, x, y):
+        """
+        Return x // y (both positive integers) using only
+        addition, subtraction, multiplication, and bitwise operations.
+
+        See divmod_newton().
+        """
+
+        return cls.divmod_newton(x, y)[0]
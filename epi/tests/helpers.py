@@ -0,0 +1,17 @@
+"""
+Helpers shared by the unit and performance tests.
+"""
+
+from epi.utils.mathextra import FrozenPoint, Rectangle
+import random
+
+def random_rectangle(span, size, integral=False):
+    """
+    Return a random Rectangle with its lower left point in [0, span] x
+    [0, span] and its width and height in [0, size]. The coordinates are
+    ints if integral, and floats otherwise.
+    """
+
+    uniform = random.randint if integral else random.uniform
+    point = FrozenPoint(uniform(0, span), uniform(0, span))
+    return Rectangle(point, uniform(0, size), uniform(0, size))
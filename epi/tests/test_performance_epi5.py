@@ -2,7 +2,39 @@ import unittest
 from epi.epi5 import *
 import timeit
 from epi.utils import timeitextra
-from math import factorial
+from epi.tests.helpers import random_rectangle
+from math import factorial, gcd
+import random, functools, operator
+
+class P3_Reverse_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cls = P3_Reverse
+
+        NUM_NUMBERS = 10000
+        self.numbers = [random.getrandbits(64) for _ in range(NUM_NUMBERS)]
+
+    def time_reverse(self, reverse):
+        def run():
+            for x in self.numbers:
+                reverse(x, 0, 64)
+
+        print()
+        print("{} 64-bit numbers: {}".format(len(self.numbers),
+                                             timeit.timeit(run, number=1)))
+
+    def test_swap_reverse(self):
+        self.time_reverse(self.cls.swap_reverse)
+
+    def test_precompute(self):
+        self.cls.fill_cache()
+        self.time_reverse(self.cls.precompute)
+
+    def test_permute_reverse(self):
+        self.time_reverse(self.cls.permute_reverse)
+
+    def tearDown(self):
+        print()
 
 class P5_Powerset_Test(unittest.TestCase):
 
@@ -101,6 +133,154 @@ class P6_StringIntegerConversion_Test(unittest.TestCase):
     def tearDown(self):
         print()
 
+class P10_GreatestCommonDivisor_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cls = P10_GreatestCommonDivisor
+
+        self.BIT_SIZES = [64, 10000]
+        self.PAIRS = []
+        for bit_size in self.BIT_SIZES:
+            common = random.getrandbits(bit_size // 4)
+            self.PAIRS.append((random.getrandbits(bit_size) * common,
+                               random.getrandbits(bit_size) * common))
+
+    def time_greatest_common_divisor(self, greatest_common_divisor):
+        print()
+        for (bit_size, (x, y)) in zip(self.BIT_SIZES, self.PAIRS):
+            wrapped = timeitextra.wrapper(greatest_common_divisor, x, y)
+            print("{} bits: {}".format(bit_size,
+                                       timeit.timeit(wrapped, number=1)))
+
+    def test_greatest_common_divisor(self):
+        self.time_greatest_common_divisor(self.cls.greatest_common_divisor)
+
+    def test_greatest_common_divisor_binary(self):
+        self.time_greatest_common_divisor(
+            self.cls.greatest_common_divisor_binary)
+
+    def test_greatest_common_divisor_lehmer(self):
+        self.time_greatest_common_divisor(
+            self.cls.greatest_common_divisor_lehmer)
+
+    def test_gcd_python(self):
+        self.time_greatest_common_divisor(gcd)
+
+    def tearDown(self):
+        print()
+
+class P12_XyRectanglesIntersect_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cls = P12_XyRectanglesIntersect
+
+        self.NUM_RECTANGLES = 1000
+        self.RECTANGLES = [random_rectangle(1000, 30)
+                           for _ in range(self.NUM_RECTANGLES)]
+        self.OTHER_RECTANGLES = [random_rectangle(1000, 30)
+                                 for _ in range(self.NUM_RECTANGLES)]
+
+    def time_function(self, function, *args):
+        wrapped = timeitextra.wrapper(function, *args)
+        print("\n{}".format(timeit.timeit(wrapped, number=1)))
+
+    def test_intersects(self):
+        intersects = self.cls.intersects
+        self.time_function(lambda: [intersects(R, S) for (R, S) in
+                                    zip(self.RECTANGLES,
+                                        self.OTHER_RECTANGLES)])
+
+    def test_intersects_many(self):
+        R = mathextra.RectangleArray.from_rectangles(self.RECTANGLES)
+        S = mathextra.RectangleArray.from_rectangles(self.OTHER_RECTANGLES)
+        self.time_function(self.cls.intersects_many, R, S)
+
+    def test_intersects_all_pairs(self):
+        intersects = self.cls.intersects
+        self.time_function(lambda: [[intersects(R, S)
+                                     for S in self.OTHER_RECTANGLES]
+                                    for R in self.RECTANGLES])
+
+    def test_intersects_matrix(self):
+        R = mathextra.RectangleArray.from_rectangles(self.RECTANGLES)
+        S = mathextra.RectangleArray.from_rectangles(self.OTHER_RECTANGLES)
+        self.time_function(self.cls.intersects_matrix, R, S)
+
+    def test_find_intersecting_pairs(self):
+        rectangles = self.RECTANGLES + self.OTHER_RECTANGLES
+        self.time_function(self.cls.find_intersecting_pairs, rectangles)
+
+    def tearDown(self):
+        print()
+
+class P13_MultiplicationBitwise_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cls = P13_MultiplicationBitwise
+
+        self.BIT_SIZES = [64, 1024, 10000, 30000, 100000]
+        self.PAIRS = [(random.getrandbits(bit_size),
+                       random.getrandbits(bit_size))
+                      for bit_size in self.BIT_SIZES]
+
+    def time_multiply_bitwise(self, multiply_bitwise, max_bit_size=None):
+        print()
+        for (bit_size, (x, y)) in zip(self.BIT_SIZES, self.PAIRS):
+            if (max_bit_size is not None and bit_size > max_bit_size):
+                break
+            wrapped = timeitextra.wrapper(multiply_bitwise, x, y)
+            print("{} bits: {}".format(bit_size,
+                                       timeit.timeit(wrapped, number=1)))
+
+    def test_multiply_bitwise(self):
+        # One bit per iteration additions are too slow past this.
+        self.time_multiply_bitwise(self.cls.multiply_bitwise, 1024)
+
+    def test_multiply_bitwise_schoolbook(self):
+        # An infinite threshold never recurses, which is shift-and-add with
+        # word-parallel additions.
+        schoolbook = functools.partial(self.cls.multiply_bitwise_karatsuba,
+                                       threshold=float('inf'))
+        self.time_multiply_bitwise(schoolbook)
+
+    def test_multiply_bitwise_karatsuba(self):
+        self.time_multiply_bitwise(self.cls.multiply_bitwise_karatsuba)
+
+    def test_multiply_python(self):
+        self.time_multiply_bitwise(operator.mul)
+
+    def tearDown(self):
+        print()
+
+class P14_FloorDivision_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cls = P14_FloorDivision
+
+        self.BIT_SIZES = [64, 1024, 10000, 100000]
+        self.PAIRS = [(random.getrandbits(bit_size),
+                       random.getrandbits(bit_size // 2))
+                      for bit_size in self.BIT_SIZES]
+
+    def time_floordiv(self, floordiv):
+        print()
+        for (bit_size, (x, y)) in zip(self.BIT_SIZES, self.PAIRS):
+            wrapped = timeitextra.wrapper(floordiv, x, y)
+            print("{} bits: {}".format(bit_size,
+                                       timeit.timeit(wrapped, number=1)))
+
+    def test_floordiv_bitwise(self):
+        self.time_floordiv(self.cls.floordiv_bitwise)
+
+    def test_floordiv_newton(self):
+        self.time_floordiv(self.cls.floordiv_newton)
+
+    def test_floordiv_python(self):
+        self.time_floordiv(operator.floordiv)
+
+    def tearDown(self):
+        print()
+
 def main():
     unittest.main()
 
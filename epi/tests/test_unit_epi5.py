@@ -91,6 +91,17 @@ class P3_Reverse_Test(unittest.TestCase):
         self.assertEqual(swap_reverse_size(1), 1 << 63)
         self.assertEqual(swap_reverse_size(3), 3 << 62)
 
+    def test_permute_reverse(self):
+        permute_reverse = self.cls.permute_reverse
+        self.assertEqual(permute_reverse(0xAAAAAAAAAAAAAAAA, 4, 60),
+                                           0xA55555555555555A)
+        self.assertEqual(permute_reverse(0x5555555555555555, 4, 60),
+                                           0x5AAAAAAAAAAAAAA5)
+        self.assertEqual(permute_reverse(1, 0, 59), 1 << 58)
+        self.assertEqual(permute_reverse(3, 1, 4), 9)
+        self.assertEqual(permute_reverse(0b00110011, 2, 6), 0b00001111)
+        self.assertEqual(permute_reverse(1, 0, 64), 1 << 63)
+
     def test_precompute(self):
         precompute = self.cls.precompute
 
@@ -453,6 +464,107 @@ class P10_GreatestCommonDivisor_Test(unittest.TestCase):
         self.assertEqual(greatest_common_divisor(8912, 184), 8)
         self.assertEqual(greatest_common_divisor(813289, 937402), 1)
 
+    def test_greatest_common_divisor_binary(self):
+        self.assert_greatest_common_divisor(
+            self.cls.greatest_common_divisor_binary)
+
+    def test_greatest_common_divisor_lehmer(self):
+        self.assert_greatest_common_divisor(
+            self.cls.greatest_common_divisor_lehmer)
+
+    def test_gcd_many(self):
+        gcd_many = self.cls.gcd_many
+
+        self.assertEqual(gcd_many([]), 0)
+        self.assertEqual(gcd_many([12, 18, 30]), 6)
+        self.assertEqual(gcd_many([0, 7]), 7)
+        values = [random.getrandbits(64) * 360 for _ in range(20)]
+        self.assertEqual(gcd_many(values), math.gcd(*values))
+
+    def test_lcm_many(self):
+        lcm_many = self.cls.lcm_many
+
+        self.assertEqual(lcm_many([]), 1)
+        self.assertEqual(lcm_many([4, 6, 10]), 60)
+        self.assertEqual(lcm_many([4, 0]), 0)
+        values = [random.randint(1, 10**6) for _ in range(20)]
+        self.assertEqual(lcm_many(values), math.lcm(*values))
+
+    def test_gcd_each(self):
+        gcd_each = self.cls.gcd_each
+
+        x = random.getrandbits(2000)
+        values = [random.randint(1, 10**12) for _ in range(50)]
+        self.assertEqual(gcd_each(x, values),
+                         [math.gcd(x, v) for v in values])
+        self.assertEqual(gcd_each(x, []), [])
+
+    def test_batch_gcd(self):
+        batch_gcd = self.cls.batch_gcd
+
+        values = [random.randint(1, 10**9) for _ in range(50)]
+        answer = [math.gcd(v, math.prod(values[:i] + values[i + 1:]))
+                  for (i, v) in enumerate(values)]
+        self.assertEqual(batch_gcd(values), answer)
+        self.assertEqual(batch_gcd([7]), [1])
+        self.assertEqual(batch_gcd([]), [])
+
+        p, q, r = 1000003, 1000033, 1000037
+        self.assertEqual(batch_gcd([p * q, q * r, 1000039 * 1000081]),
+                         [q, q, 1])
+
+    def test_extended_gcd(self):
+        extended_gcd = self.cls.extended_gcd
+
+        self.assertEqual(extended_gcd(0, 0)[0], 0)
+        NUM_TESTS_RUN = 100
+        for _ in range(NUM_TESTS_RUN):
+            random_x = random.getrandbits(100)
+            random_y = random.getrandbits(100)
+            g, s, t = extended_gcd(random_x, random_y)
+            self.assertEqual(g, math.gcd(random_x, random_y))
+            self.assertEqual(s * random_x + t * random_y, g)
+
+    def test_mod_inverse(self):
+        mod_inverse = self.cls.mod_inverse
+
+        self.assertEqual(mod_inverse(3, 7), 5)
+        self.assertEqual(mod_inverse(-3, 7), 2)
+        self.assertEqual(mod_inverse(1, 1), 0)
+        self.assertRaises(ValueError, mod_inverse, 4, 8)
+
+        m = (1 << 127) - 1
+        for _ in range(20):
+            a = random.randint(1, m - 1)
+            self.assertEqual(mod_inverse(a, m), pow(a, -1, m))
+
+    def test_batch_mod_inverse(self):
+        batch_mod_inverse = self.cls.batch_mod_inverse
+
+        m = 1000000007
+        values = [random.randint(1, m - 1) for _ in range(100)]
+        self.assertEqual(batch_mod_inverse(values, m),
+                         [pow(v, -1, m) for v in values])
+        self.assertEqual(batch_mod_inverse([], m), [])
+        self.assertEqual(batch_mod_inverse([5], m), [pow(5, -1, m)])
+        self.assertRaises(ValueError, batch_mod_inverse, [3, 4, 5], 12)
+
+    def assert_greatest_common_divisor(self, greatest_common_divisor):
+        self.assertEqual(greatest_common_divisor(64, 6), 2)
+        self.assertEqual(greatest_common_divisor(2310, 210), 210)
+        self.assertEqual(greatest_common_divisor(0, 5), 5)
+        self.assertEqual(greatest_common_divisor(5, 0), 5)
+        self.assertEqual(greatest_common_divisor(0, 0), 0)
+
+        NUM_TESTS_RUN = 100
+        for bit_size in [64, 200, 5000]:
+            for _ in range(NUM_TESTS_RUN):
+                common = random.getrandbits(bit_size // 4) + 1
+                random_x = random.getrandbits(bit_size) * common
+                random_y = random.getrandbits(bit_size) * common
+                self.assertEqual(greatest_common_divisor(random_x, random_y),
+                                 math.gcd(random_x, random_y))
+
 class P11_GeneratePrimes_Test(unittest.TestCase):
 
     def setUp(self):
@@ -491,6 +603,13 @@ class P11_GeneratePrimes_Test(unittest.TestCase):
             self.assertEqual(
                 generate_primes_list(self.MAX_NUMBERS[i]), self.PRIMES_LIST[i])
 
+    def test_generate_primes_cached_list(self):
+        generate_primes_cached_list = self.cls.generate_primes_cached_list
+
+        for i in reversed(range(len(self.MAX_NUMBERS))):
+            self.assertEqual(generate_primes_cached_list(self.MAX_NUMBERS[i]),
+                             self.PRIMES_LIST[i])
+
 class P12_XyRectanglesIntersect_Test(unittest.TestCase):
 
     def setUp(self):
@@ -651,6 +770,52 @@ class P12_XyRectanglesIntersect_Test(unittest.TestCase):
                              for rectangle in self.NON_INTERSECT_RECTANGLES)
         self.assertTrue(none_intersect)
 
+    def test_intersects_many(self):
+        intersects_many = self.cls.intersects_many
+
+        rectangles = self.INTERSECT_RECTANGLES + self.NON_INTERSECT_RECTANGLES
+        expected = [1] * len(self.INTERSECT_RECTANGLES) + \
+                   [0] * len(self.NON_INTERSECT_RECTANGLES)
+        self.assertEqual(list(intersects_many(rectangles,
+                                              self.BASE_RECTANGLE)),
+                         expected)
+        self.assertEqual(list(intersects_many(
+                                  [self.BASE_RECTANGLE] * len(rectangles),
+                                  rectangles)),
+                         expected)
+
+    def test_intersection_many(self):
+        intersection_many = self.cls.intersection_many
+        intersection = self.cls.intersection
+
+        rectangles = self.INTERSECT_RECTANGLES + self.NON_INTERSECT_RECTANGLES
+        self.assertEqual(list(intersection_many(rectangles,
+                                                self.BASE_RECTANGLE)),
+                         [intersection(rectangle, self.BASE_RECTANGLE)
+                          for rectangle in rectangles])
+
+    def test_intersects_matrix(self):
+        intersects_matrix = self.cls.intersects_matrix
+        intersects = self.cls.intersects
+
+        rectangles = [self.BASE_RECTANGLE] + self.INTERSECT_RECTANGLES + \
+                     self.NON_INTERSECT_RECTANGLES
+        answer = intersects_matrix(rectangles, rectangles)
+        self.assertEqual([list(row) for row in answer],
+                         [[intersects(R, S) for S in rectangles]
+                          for R in rectangles])
+
+    def test_find_intersecting_pairs(self):
+        find_intersecting_pairs = self.cls.find_intersecting_pairs
+        intersects = self.cls.intersects
+
+        rectangles = [self.BASE_RECTANGLE] + self.INTERSECT_RECTANGLES + \
+                     self.NON_INTERSECT_RECTANGLES
+        self.assertEqual(sorted(find_intersecting_pairs(rectangles)),
+                         [(i, j) for i in range(len(rectangles))
+                          for j in range(i + 1, len(rectangles))
+                          if intersects(rectangles[i], rectangles[j])])
+
 class P12_1_IsRectangle_Test(unittest.TestCase):
 
     def setUp(self):
@@ -736,6 +901,36 @@ class P13_MultiplicationBitwise_Test(unittest.TestCase):
 
             self.assertEqual(multiply_bitwise(random_x, random_y), product)
 
+    def test_multiply_bitwise_karatsuba(self):
+        multiply_bitwise_karatsuba = self.cls.multiply_bitwise_karatsuba
+
+        self.assertEqual(multiply_bitwise_karatsuba(0, 0), 0)
+        self.assertEqual(multiply_bitwise_karatsuba(1 << 5000, 0), 0)
+        self.assertEqual(multiply_bitwise_karatsuba(bitmanip.ones(5000),
+                                                    bitmanip.ones(5000)),
+                         bitmanip.ones(5000) ** 2)
+
+        NUM_TESTS_RUN = 100
+        MAX_BIT_SIZE = 1024
+        THRESHOLD = 16
+        for _ in range(NUM_TESTS_RUN):
+            random_x = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            random_y = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+
+            product = random_x * random_y
+
+            self.assertEqual(multiply_bitwise_karatsuba(random_x, random_y,
+                                                        THRESHOLD),
+                             product)
+
+        # y much shorter than x, multiplied a y-sized piece of x at a time
+        for y_bit_size in [THRESHOLD + 1, 100, MAX_BIT_SIZE // 2]:
+            random_x = random.getrandbits(4 * MAX_BIT_SIZE) | 1
+            random_y = random.getrandbits(y_bit_size) | (1 << (y_bit_size - 1))
+            self.assertEqual(multiply_bitwise_karatsuba(random_y, random_x,
+                                                        THRESHOLD),
+                             random_x * random_y)
+
 class P14_FloorDivision_Test(unittest.TestCase):
 
     def setUp(self):
@@ -755,6 +950,34 @@ class P14_FloorDivision_Test(unittest.TestCase):
 
             self.assertEqual(floordiv_bitwise(random_x, random_y), quotient)
 
+    def assert_divmod(self, divmod_function, max_bit_size):
+        with self.assertRaises(ZeroDivisionError):
+            divmod_function(1, 0)
+        self.assertEqual(divmod_function(0, 7), (0, 0))
+        self.assertEqual(divmod_function(6, 7), (0, 6))
+        self.assertEqual(divmod_function(1 << 500, 3), divmod(1 << 500, 3))
+
+        NUM_TESTS_RUN = 100
+        for _ in range(NUM_TESTS_RUN):
+            random_x = random.getrandbits(random.randint(1, max_bit_size))
+            random_y = random.getrandbits(random.randint(1, max_bit_size)) | 1
+
+            self.assertEqual(divmod_function(random_x, random_y),
+                             divmod(random_x, random_y))
+
+    def test_divmod_bitwise(self):
+        self.assert_divmod(self.cls.divmod_bitwise, 256)
+
+    def test_divmod_newton(self):
+        self.assert_divmod(self.cls.divmod_newton, 4096)
+
+    def test_floordiv_newton(self):
+        floordiv_newton = self.cls.floordiv_newton
+
+        x = random.getrandbits(100000)
+        y = random.getrandbits(30000)
+        self.assertEqual(floordiv_newton(x, y), x // y)
+
 def main():
     unittest.main()
 
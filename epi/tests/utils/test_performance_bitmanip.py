@@ -0,0 +1,145 @@
+import unittest
+from epi.utils.bitmanip import *
+import random, timeit
+from epi.utils import timeitextra
+
+class add_bitwise_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.BIT_SIZES = [64, 1024, 10000]
+        self.RANDOM_PAIRS = [(random.getrandbits(bit_size),
+                              random.getrandbits(bit_size))
+                             for bit_size in self.BIT_SIZES]
+        self.RIPPLE_PAIRS = [(ones(bit_size), 1)
+                             for bit_size in self.BIT_SIZES]
+
+    def time_add_bitwise(self, add_bitwise_function):
+        print()
+        for (bit_size, random_pair, ripple_pair) in \
+                zip(self.BIT_SIZES, self.RANDOM_PAIRS, self.RIPPLE_PAIRS):
+            random_wrapped = timeitextra.wrapper(add_bitwise_function,
+                                                 *random_pair)
+            ripple_wrapped = timeitextra.wrapper(add_bitwise_function,
+                                                 *ripple_pair)
+            print("{} bits: random {}, ripple {}".format(
+                  bit_size,
+                  timeit.timeit(random_wrapped, number=1),
+                  timeit.timeit(ripple_wrapped, number=1)))
+
+    def test_add_bitwise(self):
+        self.time_add_bitwise(add_bitwise)
+
+    def test_add_bitwise_carry(self):
+        self.time_add_bitwise(add_bitwise_carry)
+
+    def test_add_bitwise_kogge_stone(self):
+        self.time_add_bitwise(add_bitwise_kogge_stone)
+
+    def tearDown(self):
+        print()
+
+class majority_bitwise_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.BIT_SIZE = 10000
+        self.NUMS_BIT_ARRAYS = [3, 11, 21]
+        self.BIT_ARRAYS = [[random.getrandbits(self.BIT_SIZE)
+                            for _ in range(num_bit_arrays)]
+                           for num_bit_arrays in self.NUMS_BIT_ARRAYS]
+
+    def time_majority_bitwise(self, majority_bitwise_function):
+        print()
+        for bit_arrays in self.BIT_ARRAYS:
+            wrapped = timeitextra.wrapper(majority_bitwise_function,
+                                          *bit_arrays)
+            print("{} bit arrays: {}".format(len(bit_arrays),
+                                             timeit.timeit(wrapped,
+                                                           number=1)))
+
+    def test_majority_bitwise(self):
+        self.time_majority_bitwise(majority_bitwise)
+
+    def test_majority_bitwise_count(self):
+        self.time_majority_bitwise(majority_bitwise_count)
+
+    def tearDown(self):
+        print()
+
+class same_bits_up_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.K = 10
+        self.N_BITS = 20
+
+    def time_same_bits_up(self, same_bits_up_function):
+        def run():
+            x = ones(self.K)
+            stop = 1 << self.N_BITS
+            while (x < stop):
+                x = same_bits_up_function(x)
+
+        print()
+        print("{} choose {}: {}".format(self.N_BITS, self.K,
+                                        timeit.timeit(run, number=1)))
+
+    def test_same_bits_up(self):
+        self.time_same_bits_up(same_bits_up)
+
+    def test_same_bits_up_gosper(self):
+        self.time_same_bits_up(same_bits_up_gosper)
+
+    def test_iter_same_popcount(self):
+        def run():
+            for chunk in iter_same_popcount(self.K, self.N_BITS):
+                pass
+
+        print()
+        print("{} choose {}: {}".format(self.N_BITS, self.K,
+                                        timeit.timeit(run, number=1)))
+
+    def tearDown(self):
+        print()
+
+class popcount_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.BIT_SIZES = [64, 1024, 10000, 100000]
+        self.NUMBERS = [random.getrandbits(bit_size)
+                        for bit_size in self.BIT_SIZES]
+
+    def time_popcount(self, popcount_function):
+        print()
+        for (bit_size, x) in zip(self.BIT_SIZES, self.NUMBERS):
+            wrapped = timeitextra.wrapper(popcount_function, x)
+            print("{} bits: {}".format(bit_size,
+                                       timeit.timeit(wrapped, number=1)))
+
+    def test_popcount(self):
+        self.time_popcount(popcount)
+
+    def test_popcount_drop(self):
+        self.time_popcount(popcount_drop)
+
+    def test_popcount_table(self):
+        fill_popcount_table()
+        self.time_popcount(popcount_table)
+
+    def test_iter_set_bits(self):
+        self.time_popcount(lambda x: sum(1 for _ in iter_set_bits(x)))
+
+    def test_iter_set_bits_drop(self):
+        def iter_set_bits_drop(x):
+            while (x):
+                yield count_trailing_zeros(x)
+                x = drop_lowest_set_bit(x)
+
+        self.time_popcount(lambda x: sum(1 for _ in iter_set_bits_drop(x)))
+
+    def tearDown(self):
+        print()
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
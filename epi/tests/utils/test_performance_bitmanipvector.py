@@ -0,0 +1,51 @@
+import unittest
+from epi.utils import bitmanip, bitmanipvector
+from array import array
+import random, timeit
+from epi.utils import timeitextra
+
+class bitmanipvector_Test(unittest.TestCase):
+
+    def setUp(self):
+        NUM_WORDS = 1000000
+        self.words = array('Q', [random.getrandbits(64)
+                                 for _ in range(NUM_WORDS)])
+
+    def time_vector(self, name, *args):
+        vector_function = getattr(bitmanipvector, name)
+        scalar_function = getattr(bitmanip, name)
+
+        def scalar_loop(words, *args):
+            return array('Q', [scalar_function(x, *args)
+                               & bitmanipvector.WORD_MASK for x in words])
+
+        print()
+        for function in [vector_function, scalar_loop]:
+            wrapped = timeitextra.wrapper(function, self.words, *args)
+            print("{} {} words: {}".format(function.__name__,
+                                           len(self.words),
+                                           timeit.timeit(wrapped, number=1)))
+
+    def test_drop_lowest_set_bit(self):
+        self.time_vector('drop_lowest_set_bit')
+
+    def test_get_lowest_set_bit(self):
+        self.time_vector('get_lowest_set_bit')
+
+    def test_set_bit(self):
+        self.time_vector('set_bit', 17)
+
+    def test_swap_bits_index(self):
+        self.time_vector('swap_bits_index', 3, 40)
+
+    def test_permute_bits(self):
+        self.time_vector('permute_bits', list(reversed(range(64))))
+
+    def tearDown(self):
+        print()
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
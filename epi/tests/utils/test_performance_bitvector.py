@@ -0,0 +1,98 @@
+import unittest
+from epi.utils.bitvector import *
+import random, timeit
+
+class BitVector_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.LENGTH = 1 << 22
+        self.NUM_QUERIES = 10000
+        self.x = random.getrandbits(self.LENGTH)
+        self.bit_vector = BitVector.from_int(self.x)
+        self.indices = [random.randrange(self.LENGTH)
+                        for _ in range(self.NUM_QUERIES)]
+
+    def time_queries(self, name, query):
+        def run():
+            for i in self.indices:
+                query(i)
+
+        print()
+        print("{} {} queries on {} bits: {}".format(
+              name, self.NUM_QUERIES, self.LENGTH,
+              timeit.timeit(run, number=1)))
+
+    def test_from_int(self):
+        print()
+        print("from_int {} bits: {}".format(
+              self.LENGTH,
+              timeit.timeit(lambda: BitVector.from_int(self.x), number=1)))
+
+    def test_get_bit_int(self):
+        self.time_queries("int get_bit", lambda i: bitmanip.get_bit(self.x, i))
+
+    def test_getitem(self):
+        self.time_queries("getitem", self.bit_vector.__getitem__)
+
+    def test_rank(self):
+        self.time_queries("rank", self.bit_vector.rank)
+
+    def test_select(self):
+        count = self.bit_vector.count()
+        self.time_queries("select", lambda i: self.bit_vector.select(i % count))
+
+    def tearDown(self):
+        print()
+
+class Bitset_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.LENGTH = 10 ** 7
+        self.NUM_UPDATES = 10000
+        self.indices = [random.randrange(self.LENGTH)
+                        for _ in range(self.NUM_UPDATES)]
+
+    def test_set_bit_int(self):
+        def run():
+            x = 1 << self.LENGTH
+            for i in self.indices:
+                x = bitmanip.set_bit(x, i)
+
+        print()
+        print("int set_bit {} updates on {} bits: {}".format(
+              self.NUM_UPDATES, self.LENGTH, timeit.timeit(run, number=1)))
+
+    def test_set(self):
+        bitset = Bitset(self.LENGTH)
+
+        def run():
+            for i in self.indices:
+                bitset.set(i)
+
+        print()
+        print("set {} updates on {} bits: {}".format(
+              self.NUM_UPDATES, self.LENGTH, timeit.timeit(run, number=1)))
+
+    def test_operators(self):
+        bitset_x = Bitset.from_int(random.getrandbits(self.LENGTH),
+                                   self.LENGTH)
+        bitset_y = Bitset.from_int(random.getrandbits(self.LENGTH),
+                                   self.LENGTH)
+
+        def run():
+            bitset_x.__ior__(bitset_y)
+            bitset_x.__iand__(bitset_y)
+            bitset_x.__ixor__(bitset_y)
+
+        print()
+        print("|=, &=, ^= on {} bits: {}".format(
+              self.LENGTH, timeit.timeit(run, number=1)))
+
+    def tearDown(self):
+        print()
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
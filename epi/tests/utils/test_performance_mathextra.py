@@ -1,6 +1,6 @@
 import unittest
 from epi.utils.mathextra import *
-import timeit
+import array, random, timeit, tracemalloc
 from epi.utils import timeitextra
 
 class is_prime_Test(unittest.TestCase):
@@ -23,6 +23,152 @@ class is_prime_Test(unittest.TestCase):
     def tearDown(self):
         print()
 
+class int_sqrt_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.BIT_SIZES = [64, 1024, 10000, 100000]
+        self.NUMBERS = [random.getrandbits(bit_size) | (1 << (bit_size - 1))
+                        for bit_size in self.BIT_SIZES]
+
+    def time_int_sqrt(self, int_sqrt_function):
+        print()
+        for (bit_size, number) in zip(self.BIT_SIZES, self.NUMBERS):
+            wrapped = timeitextra.wrapper(int_sqrt_function, number)
+            print("{} bits: {}".format(bit_size,
+                                       timeit.timeit(wrapped, number=1)))
+
+    def test_int_sqrt(self):
+        self.time_int_sqrt(int_sqrt)
+
+    def test_int_sqrt_karatsuba(self):
+        self.time_int_sqrt(int_sqrt_karatsuba)
+
+    def test_int_sqrt_python(self):
+        self.time_int_sqrt(int_sqrt_python)
+
+    def tearDown(self):
+        print()
+
+class n_choose_r_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.N = 10**5
+        self.R = self.N // 2
+
+    def test_n_choose_r_fraction(self):
+        wrapped = timeitextra.wrapper(n_choose_r_fraction, self.N, self.R)
+        print("\n{}".format(timeit.timeit(wrapped, number=1)))
+
+    def test_n_choose_r_multiplicative(self):
+        wrapped = timeitextra.wrapper(n_choose_r_multiplicative,
+                                      self.N,
+                                      self.R)
+        print("\n{}".format(timeit.timeit(wrapped, number=1)))
+
+    def test_n_choose_r_prime_exponents(self):
+        wrapped = timeitextra.wrapper(n_choose_r_prime_exponents,
+                                      self.N,
+                                      self.R)
+        print("\n{}".format(timeit.timeit(wrapped, number=1)))
+
+    def test_n_choose_r_crossover(self):
+        NUMBER = 200
+        print()
+        for (n, r) in [(100, 41), (100, 50), (300, 150), (1000, 200),
+                       (1000, 500), (3000, 300), (3000, 500), (10**4, 700),
+                       (10**5, 2200)]:
+            times = [timeit.timeit(timeitextra.wrapper(function, n, r),
+                                   number=NUMBER) / NUMBER
+                     for function in [n_choose_r_multiplicative,
+                                      n_choose_r_prime_exponents,
+                                      n_choose_r]]
+            print("n={} r={}: multiplicative {:.1f} us, prime exponents "
+                  "{:.1f} us, n_choose_r {:.1f} us".format(
+                      n, r, *(time * 10**6 for time in times)))
+
+    def tearDown(self):
+        print()
+
+class SlotsPoint_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_POINTS = 100000
+        self.NUM_OPERATIONS = 100000
+
+    def time_point(self, point_class):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        points = [point_class(float(i), float(i))
+                  for i in range(self.NUM_POINTS)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # The floats are counted too, which is the same for every class.
+        print()
+        print("{}: {} bytes per point".format(point_class.__name__,
+              (after - before) // self.NUM_POINTS))
+
+        p = point_class(3.0, 4.0)
+        q = point_class(1.0, 2.0)
+        for (name, operation) in [("+", lambda: p + q),
+                                  ("-", lambda: p - q),
+                                  ("*", lambda: p * 2.0),
+                                  ("dot", lambda: p.dot(q)),
+                                  ("norm", lambda: p.norm())]:
+            seconds = timeit.timeit(operation, number=self.NUM_OPERATIONS)
+            print("{}: {:.0f} ops/sec".format(name,
+                                              self.NUM_OPERATIONS / seconds))
+
+    def test_frozen_point(self):
+        self.time_point(FrozenPoint)
+
+    def test_frozen_slots_point(self):
+        self.time_point(FrozenSlotsPoint)
+
+    def test_mutable_point(self):
+        self.time_point(MutablePoint)
+
+    def test_mutable_slots_point(self):
+        self.time_point(MutableSlotsPoint)
+
+    def tearDown(self):
+        print()
+
+class PointArray_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_POINTS = 1 << 18
+        self.POINTS = [FrozenPoint(random.uniform(-1, 1), random.uniform(-1, 1))
+                       for _ in range(self.NUM_POINTS)]
+        self.POINT_ARRAY = PointArray.from_points(self.POINTS)
+        self.POINT = FrozenPoint(0.5, -0.5)
+
+    def time_operations(self, operations):
+        print()
+        for (name, operation) in operations:
+            seconds = timeit.timeit(operation, number=1)
+            print("{}: {}".format(name, seconds))
+
+    def test_point_list(self):
+        points, point = self.POINTS, self.POINT
+        self.time_operations([
+            ("+", lambda: [p + point for p in points]),
+            ("*", lambda: [p * 2.0 for p in points]),
+            ("dot", lambda: [p.dot(point) for p in points]),
+            ("norm", lambda: [p.norm() for p in points]),
+            ("region", lambda: [p.region for p in points])])
+
+    def test_point_array(self):
+        point_array, point = self.POINT_ARRAY, self.POINT
+        self.time_operations([
+            ("+", lambda: point_array + point),
+            ("*", lambda: point_array * 2.0),
+            ("dot", lambda: point_array.dot(point)),
+            ("norm", lambda: point_array.norm()),
+            ("region", lambda: point_array.region_values())])
+
+    def tearDown(self):
+        print()
+
 def main():
     unittest.main()
 
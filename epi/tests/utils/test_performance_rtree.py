@@ -0,0 +1,76 @@
+import unittest
+from epi.utils.rtree import *
+from epi.utils.mathextra import FrozenPoint, Rectangle, RectangleArray
+from epi.tests.helpers import random_rectangle
+import random, timeit
+
+class RTree_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_RECTANGLES = 100000
+        self.NUM_QUERIES = 100
+        self.RECTANGLES = [random_rectangle(10000, 30)
+                           for _ in range(self.NUM_RECTANGLES)]
+        self.WINDOWS = [random_rectangle(10000, 100)
+                        for _ in range(self.NUM_QUERIES)]
+        self.POINTS = [FrozenPoint(random.uniform(0, 10000),
+                                   random.uniform(0, 10000))
+                       for _ in range(self.NUM_QUERIES)]
+
+    def time_queries(self, name, query, queries):
+        def run():
+            for q in queries:
+                query(q)
+
+        print()
+        print("{} {} queries on {} rectangles: {}".format(
+              name, len(queries), self.NUM_RECTANGLES,
+              timeit.timeit(run, number=1)))
+
+    def test_build(self):
+        print()
+        print("build {} rectangles: {}".format(
+              self.NUM_RECTANGLES,
+              timeit.timeit(lambda: RTree(self.RECTANGLES), number=1)))
+
+    def test_query_window(self):
+        tree = RTree(self.RECTANGLES)
+        self.time_queries("query_window", tree.query_window, self.WINDOWS)
+
+    def test_query_window_scan(self):
+        self.time_queries("scan intersects",
+                          lambda window: [i for (i, rectangle) in
+                                          enumerate(self.RECTANGLES)
+                                          if rectangle.intersects(window)],
+                          self.WINDOWS[:1])
+
+    def test_query_window_rectangle_array(self):
+        rectangle_array = RectangleArray.from_rectangles(self.RECTANGLES)
+        self.time_queries("RectangleArray.intersects_many",
+                          rectangle_array.intersects_many, self.WINDOWS)
+
+    def test_query_point(self):
+        tree = RTree(self.RECTANGLES)
+        self.time_queries("query_point", tree.query_point, self.POINTS)
+
+    def test_query_nearest(self):
+        tree = RTree(self.RECTANGLES)
+        self.time_queries("query_nearest k=10",
+                          lambda point: tree.query_nearest(point, 10),
+                          self.POINTS)
+
+    def test_from_buffer(self):
+        buffer = RTree(self.RECTANGLES).to_bytes()
+        print()
+        print("from_buffer {} bytes: {}".format(
+              len(buffer),
+              timeit.timeit(lambda: RTree.from_buffer(buffer), number=1)))
+
+    def tearDown(self):
+        print()
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import unittest
 from epi.utils.bitmanip import *
+import array, itertools, random
 
 class ones_Test(unittest.TestCase):
 
@@ -71,6 +72,15 @@ class unset_bit_Test(unittest.TestCase):
         x = unset_bit(x, 3)
         self.assertEqual(get_bit(x, 3), 0)
 
+class count_trailing_zeros_Test(unittest.TestCase):
+
+    def test_count_trailing_zeros(self):
+        self.assertEqual(count_trailing_zeros(0), -1)
+        self.assertEqual(count_trailing_zeros(1), 0)
+        self.assertEqual(count_trailing_zeros(0b101000), 3)
+        self.assertEqual(count_trailing_zeros(1 << 100), 100)
+        self.assertEqual(count_trailing_zeros(-4), 2)
+
 class same_bits_up_Test(unittest.TestCase):
 
     def test_same_bits_up(self):
@@ -107,6 +117,10 @@ class same_bits_up_Test(unittest.TestCase):
         self.assertEqual(same_bits_up(-14), -12)
         self.assertEqual(same_bits_up(-15), -14)
 
+    def test_same_bits_up_gosper(self):
+        for x in range(-1000, 1000):
+            self.assertEqual(same_bits_up_gosper(x), same_bits_up(x))
+
 class same_bits_down_Test(unittest.TestCase):
 
     def test_same_bits_down(self):
@@ -143,6 +157,132 @@ class same_bits_down_Test(unittest.TestCase):
         self.assertEqual(same_bits_down(-14), -15)
         self.assertEqual(same_bits_down(-15), -20)
 
+    def test_same_bits_down_gosper(self):
+        for x in range(-1000, 1000):
+            self.assertEqual(same_bits_down_gosper(x), same_bits_down(x))
+
+class iter_same_popcount_Test(unittest.TestCase):
+
+    def test_iter_same_popcount(self):
+        for n_bits in range(10):
+            for k in range(n_bits + 1):
+                expected = sorted(sum(1 << i for i in combination)
+                                  for combination in
+                                  itertools.combinations(range(n_bits), k))
+                numbers = [x for chunk in iter_same_popcount(k, n_bits,
+                                                             chunk_size=7)
+                           for x in chunk]
+                self.assertEqual(numbers, expected)
+
+    def test_iter_same_popcount_start_stop(self):
+        numbers = [x for chunk in iter_same_popcount(3, 10, start=0b1011,
+                                                     stop=0b110000)
+                   for x in chunk]
+        self.assertEqual(numbers[0], 0b1011)
+        self.assertEqual(numbers[-1], 0b101100)
+        self.assertEqual(len(numbers), 15)
+
+        with self.assertRaises(ValueError):
+            next(iter_same_popcount(3, 10, start=0b1111))
+
+    def test_iter_same_popcount_chunks(self):
+        chunks = list(iter_same_popcount(2, 64))
+        self.assertIsInstance(chunks[0], array.array)
+        self.assertEqual(sum(map(len, chunks)), 2016)
+        self.assertEqual(chunks[-1][-1], 0b11 << 62)
+
+        chunk = next(iter_same_popcount(2, 65))
+        self.assertIsInstance(chunk, list)
+
+class popcount_Test(unittest.TestCase):
+
+    def assert_popcount(self, popcount_function):
+        self.assertEqual(popcount_function(0), 0)
+        self.assertEqual(popcount_function(1), 1)
+        self.assertEqual(popcount_function(0b1011), 3)
+        self.assertEqual(popcount_function(ones(1000)), 1000)
+        self.assertEqual(popcount_function(1 << 1000), 1)
+
+        NUM_TESTS_RUN = 100
+        MAX_BIT_SIZE = 1024
+        for _ in range(NUM_TESTS_RUN):
+            x = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            self.assertEqual(popcount_function(x), bin(x).count("1"))
+
+    def test_popcount(self):
+        self.assert_popcount(popcount)
+
+    def test_popcount_drop(self):
+        self.assert_popcount(popcount_drop)
+
+    def test_popcount_table(self):
+        self.assert_popcount(popcount_table)
+        self.assertEqual(popcount_table(-7), 3)
+
+    def test_popcount_many(self):
+        self.assertEqual(popcount_many([]), array.array('Q'))
+        self.assertEqual(popcount_many(array.array('Q', [0, 7, ones(64)])),
+                         array.array('Q', [0, 3, 64]))
+        self.assertEqual(popcount_many([ones(100), 1 << 100]),
+                         array.array('Q', [100, 1]))
+
+class iter_set_bits_Test(unittest.TestCase):
+
+    def test_iter_set_bits(self):
+        self.assertEqual(list(iter_set_bits(0)), [])
+        self.assertEqual(list(iter_set_bits(0b1011)), [0, 1, 3])
+        self.assertEqual(list(iter_set_bits((1 << 1000) | (1 << 64))),
+                         [64, 1000])
+        with self.assertRaises(ValueError):
+            next(iter_set_bits(-1))
+
+        NUM_TESTS_RUN = 100
+        MAX_BIT_SIZE = 1024
+        for _ in range(NUM_TESTS_RUN):
+            x = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            self.assertEqual(list(iter_set_bits(x)),
+                             [i for i in range(x.bit_length())
+                              if get_bit(x, i)])
+
+class permute_bits_Test(unittest.TestCase):
+
+    def permute_bits_reference(self, x, permutation):
+        answer = x & ~ones(len(permutation))
+        for (i, destination) in enumerate(permutation):
+            answer |= get_bit(x, i) << destination
+        return answer
+
+    def test_delta_swap(self):
+        self.assertEqual(delta_swap(0b0001, 0b0011, 2), 0b0100)
+        self.assertEqual(delta_swap(0b0101, 0b0011, 2), 0b0101)
+        self.assertEqual(delta_swap(0xFF, 0xFF, 8), 0xFF00)
+
+    def test_permute_bits(self):
+        NUM_TESTS_RUN = 20
+        for length in list(range(20)) + [31, 32, 33, 64, 100, 128]:
+            for _ in range(NUM_TESTS_RUN):
+                permutation = list(range(length))
+                random.shuffle(permutation)
+                x = random.getrandbits(length + 10)
+                self.assertEqual(permute_bits(x, permutation),
+                                 self.permute_bits_reference(x, permutation))
+
+    def test_compile_permutation(self):
+        self.assertEqual(compile_permutation(tuple(range(64))), ())
+
+        # Reversing 64 bits is one delta swap per shift.
+        reverse = tuple(reversed(range(64)))
+        self.assertEqual(len(compile_permutation(reverse)), 6)
+
+        for length in [2, 16, 64, 128]:
+            permutation = list(range(length))
+            random.shuffle(permutation)
+            plan = compile_permutation(tuple(permutation))
+            self.assertLessEqual(len(plan), 2 * log2_python(length) - 1)
+
+        with self.assertRaises(ValueError):
+            compile_permutation((0, 0, 1))
+
 class log2_Test(unittest.TestCase):
 
     def test_log2(self):
@@ -165,6 +305,97 @@ class log2_Test(unittest.TestCase):
         self.assertEqual(log2_cached(1 << 21), 21)
         self.assertEqual(log2_cached(1 << 99), 99)
 
+class add_bitwise_Test(unittest.TestCase):
+
+    def assert_add_bitwise(self, add_bitwise_function):
+        self.assertEqual(add_bitwise_function(0, 0), 0)
+        self.assertEqual(add_bitwise_function(ones(100), 1), 1 << 100)
+
+        NUM_TESTS_RUN = 100
+        MAX_BIT_SIZE = 256
+        for _ in range(NUM_TESTS_RUN):
+            random_x = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            random_y = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            self.assertEqual(add_bitwise_function(random_x, random_y),
+                             random_x + random_y)
+
+    def test_add_bitwise(self):
+        self.assert_add_bitwise(add_bitwise)
+
+    def test_add_bitwise_carry(self):
+        self.assert_add_bitwise(add_bitwise_carry)
+
+    def test_add_bitwise_kogge_stone(self):
+        self.assert_add_bitwise(add_bitwise_kogge_stone)
+
+class subtract_bitwise_Test(unittest.TestCase):
+
+    def test_subtract_bitwise(self):
+        self.assertEqual(subtract_bitwise(0, 0), 0)
+        self.assertEqual(subtract_bitwise(1 << 100, 1), ones(100))
+        self.assertEqual(subtract_bitwise(ones(100), ones(100)), 0)
+
+        NUM_TESTS_RUN = 100
+        MAX_BIT_SIZE = 256
+        for _ in range(NUM_TESTS_RUN):
+            random_x = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            random_y = random.getrandbits(random.randint(1, MAX_BIT_SIZE))
+            if (random_x < random_y):
+                random_x, random_y = random_y, random_x
+            self.assertEqual(subtract_bitwise(random_x, random_y),
+                             random_x - random_y)
+
+class majority_count_Test(unittest.TestCase):
+
+    def test_count_bitwise(self):
+        self.assertEqual(count_bitwise(), [])
+        self.assertEqual(count_bitwise(0b1, 0b1, 0b1), [0b1, 0b1])
+        self.assertEqual(count_bitwise(0b011, 0b110, 0b111),
+                         [0b010, 0b111])
+
+    def test_at_least_bitwise(self):
+        self.assertEqual(at_least_bitwise(0, 0b0), -1)
+        self.assertEqual(at_least_bitwise(1, 0b001, 0b100), 0b101)
+        self.assertEqual(at_least_bitwise(3, 0b001, 0b100), 0)
+        self.assertEqual(at_least_bitwise(2, 0b011, 0b110, 0b101), 0b111)
+        self.assertEqual(at_least_bitwise(3, 0b011, 0b110, 0b111), 0b010)
+
+        NUM_TESTS_RUN = 100
+        MAX_NUM_BIT_ARRAYS = 12
+        BIT_SIZE = 32
+        for _ in range(NUM_TESTS_RUN):
+            bit_arrays = [random.getrandbits(BIT_SIZE)
+                          for _ in range(random.randint(1,
+                                                        MAX_NUM_BIT_ARRAYS))]
+            k = random.randint(1, len(bit_arrays))
+            expected = 0
+            for i in range(BIT_SIZE):
+                if (sum(get_bit(x, i) for x in bit_arrays) >= k):
+                    expected = set_bit(expected, i)
+            self.assertEqual(at_least_bitwise(k, *bit_arrays), expected)
+
+    def test_majority_bitwise_count(self):
+        with self.assertRaises(TypeError):
+            majority_bitwise_count()
+        self.assertEqual(majority_bitwise_count(-1, 0b10, 0b11), 0b11)
+
+        NUM_TESTS_RUN = 100
+        MAX_NUM_BIT_ARRAYS = 9
+        MAX_BIT_SIZE = 64
+        for _ in range(NUM_TESTS_RUN):
+            bit_arrays = [random.getrandbits(MAX_BIT_SIZE)
+                          for _ in range(random.randint(1,
+                                                        MAX_NUM_BIT_ARRAYS))]
+            self.assertEqual(majority_bitwise_count(*bit_arrays),
+                             majority_bitwise(*bit_arrays))
+
+    def test_majority_logical_count(self):
+        with self.assertRaises(TypeError):
+            majority_logical_count()
+        self.assertTrue(majority_logical_count(True, False, True))
+        self.assertFalse(majority_logical_count(True, False, False, True))
+        self.assertTrue(majority_logical_count(1, 0b100, 0))
+
 def main():
     unittest.main()
 
@@ -0,0 +1,88 @@
+import unittest
+from epi.utils import bitmanip, bitmanipvector
+from array import array
+import random
+
+class bitmanipvector_Test(unittest.TestCase):
+    """
+    Check every vector function against its bitmanip version applied to
+    each word (modulo 2**64).
+    """
+
+    def setUp(self):
+        EDGE_WORDS = [0, 1, bitmanipvector.WORD_MASK,
+                      bitmanipvector.HIGH_BIT,
+                      bitmanipvector.WORD_MASK - 1,
+                      bitmanipvector.HIGH_BIT - 1]
+        # More than one chunk, and a partial last chunk.
+        NUM_RANDOM_WORDS = bitmanipvector.CHUNK_WORDS + 100
+        self.words = array('Q', EDGE_WORDS +
+                                [random.getrandbits(64)
+                                 for _ in range(NUM_RANDOM_WORDS)])
+
+    def assert_vector(self, name, *args):
+        vector_function = getattr(bitmanipvector, name)
+        scalar_function = getattr(bitmanip, name)
+
+        expected = array('Q', [scalar_function(x, *args)
+                               & bitmanipvector.WORD_MASK
+                               for x in self.words])
+        self.assertEqual(vector_function(self.words, *args), expected)
+        self.assertEqual(vector_function(list(self.words[:10]), *args),
+                         expected[:10])
+        self.assertEqual(vector_function(array('Q'), *args), array('Q'))
+
+    def test_to_int_from_int(self):
+        x = bitmanipvector.to_int(self.words)
+        self.assertEqual(x & bitmanipvector.WORD_MASK, self.words[0])
+        self.assertEqual(x >> ((len(self.words) - 1) * 64), self.words[-1])
+        self.assertEqual(bitmanipvector.from_int(x, len(self.words)),
+                         self.words)
+        self.assertEqual(bitmanipvector.from_int(x, 1), self.words[:1])
+
+    def test_bit_index(self):
+        for k in [0, 1, 31, 63, 64, 100]:
+            self.assert_vector('get_bit', k)
+            self.assert_vector('get_bit_position', k)
+            self.assert_vector('set_bit', k)
+            self.assert_vector('unset_bit', k)
+            self.assert_vector('toggle_bit', k)
+            self.assert_vector('get_least_significant_bits', k)
+
+    def test_lowest_bit(self):
+        self.assert_vector('drop_lowest_set_bit')
+        self.assert_vector('drop_lowest_unset_bit')
+        self.assert_vector('right_extend_lowest_set_bit')
+        self.assert_vector('right_extend_lowest_unset_bit')
+        self.assert_vector('get_lowest_set_bit')
+        self.assert_vector('get_lowest_unset_bit')
+
+    def test_get_bits(self):
+        for (k, size, offset) in [(0, 8, 0), (3, 8, 0), (7, 8, 0), (8, 8, 0),
+                                  (1, 16, 5), (0, 64, 0), (1, 32, 1)]:
+            self.assert_vector('get_bits', k, size, offset)
+
+    def test_swap_bits_index(self):
+        for i in [0, 5, 62, 63]:
+            self.assert_vector('swap_bits_index', i)
+            for j in [0, 17, 63]:
+                self.assert_vector('swap_bits_index', i, j)
+
+    def test_shift_bits(self):
+        for k in [-100, -64, -63, -10, -1, 0, 1, 10, 63, 64, 100]:
+            self.assert_vector('shift_bits', k)
+
+    def test_permute_bits(self):
+        for length in [0, 5, 32, 64]:
+            permutation = list(range(length))
+            random.shuffle(permutation)
+            self.assert_vector('permute_bits', permutation)
+
+        with self.assertRaises(ValueError):
+            bitmanipvector.permute_bits(self.words, range(65))
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
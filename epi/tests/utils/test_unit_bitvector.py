@@ -0,0 +1,216 @@
+import unittest
+from epi.utils.bitvector import *
+from array import array
+import random
+
+class BitVector_Test(unittest.TestCase):
+
+    def random_bits(self, length, density):
+        return [int(random.random() < density) for _ in range(length)]
+
+    def assert_bit_vector(self, bits):
+        x = sum(bit << i for (i, bit) in enumerate(bits))
+        bit_vector = BitVector.from_int(x, len(bits))
+
+        self.assertEqual(len(bit_vector), len(bits))
+        self.assertEqual(list(bit_vector), bits)
+        self.assertEqual(bit_vector.to_int(), x)
+
+        set_bits = [i for (i, bit) in enumerate(bits) if bit]
+        self.assertEqual(bit_vector.count(), len(set_bits))
+        self.assertEqual(list(bit_vector.iter_set_bits()), set_bits)
+
+        rank = 0
+        for i in range(len(bits) + 1):
+            self.assertEqual(bit_vector.rank(i), rank)
+            self.assertEqual(bit_vector.rank0(i), i - rank)
+            if (i < len(bits)):
+                rank += bits[i]
+
+        for (j, i) in enumerate(set_bits):
+            self.assertEqual(bit_vector.select(j), i)
+
+    def test_empty(self):
+        bit_vector = BitVector()
+        self.assertEqual(len(bit_vector), 0)
+        self.assertEqual(bit_vector.rank(0), 0)
+        with self.assertRaises(IndexError):
+            bit_vector[0]
+        with self.assertRaises(IndexError):
+            bit_vector.select(0)
+
+    def test_rank_select(self):
+        for density in [0.001, 0.01, 0.5, 0.99, 1]:
+            self.assert_bit_vector(self.random_bits(3000, density))
+
+    def test_rank_select_superblocks(self):
+        # More than one superblock and select sample.
+        length = 3 * BitVector.SUPERBLOCK_WORDS * BitVector.WORD_BITS + 5
+        self.assert_bit_vector(self.random_bits(length, 0.3))
+
+    def test_select_sparse(self):
+        length = 1 << 20
+        x = 1 | (1 << 500000) | (1 << (length - 1))
+        bit_vector = BitVector.from_int(x)
+        self.assertEqual([bit_vector.select(j) for j in range(3)],
+                         [0, 500000, length - 1])
+        with self.assertRaises(IndexError):
+            bit_vector.select(3)
+
+    def test_getitem(self):
+        bit_vector = BitVector.from_int(0b1101)
+        self.assertEqual(bit_vector[0], 1)
+        self.assertEqual(bit_vector[1], 0)
+        self.assertEqual(bit_vector[-1], 1)
+        with self.assertRaises(IndexError):
+            bit_vector[4]
+
+    def test_words(self):
+        words = array('Q', [bitmanip.ones(64), bitmanip.ones(64)])
+        bit_vector = BitVector(words, 70)
+        self.assertEqual(bit_vector.count(), 70)
+        self.assertEqual(bit_vector.to_int(), bitmanip.ones(70))
+        # The words passed in aren't changed.
+        self.assertEqual(words[1], bitmanip.ones(64))
+
+        view = bit_vector.to_memoryview()
+        self.assertTrue(view.readonly)
+        self.assertEqual(view.tolist(), [bitmanip.ones(64), bitmanip.ones(6)])
+
+        with self.assertRaises(ValueError):
+            BitVector(words, 129)
+
+    def test_bytes(self):
+        data = bytes(random.getrandbits(8) for _ in range(101))
+        bit_vector = BitVector.from_bytes(data)
+        self.assertEqual(len(bit_vector), 808)
+        self.assertEqual(bit_vector.to_int(), int.from_bytes(data, "little"))
+        self.assertEqual(bit_vector.to_bytes(), data)
+        self.assertEqual(BitVector.from_bytes(b"\xff", 3).to_int(), 0b111)
+
+    def test_hash(self):
+        x = random.getrandbits(1000)
+        bit_vector = BitVector.from_int(x, 1000)
+        self.assertEqual(hash(bit_vector), hash(BitVector.from_int(x, 1000)))
+        self.assertEqual(len({bit_vector, BitVector.from_int(x, 1000),
+                              BitVector.from_int(x, 1001)}), 2)
+
+class Bitset_Test(unittest.TestCase):
+
+    def test_set_unset_toggle(self):
+        bitset = Bitset(130)
+        self.assertEqual(len(bitset), 130)
+        self.assertEqual(bitset.to_int(), 0)
+
+        bitset.set(0)
+        bitset.set(64)
+        bitset.set(129)
+        self.assertEqual(bitset.to_int(), 1 | (1 << 64) | (1 << 129))
+        self.assertTrue(bitset.test(64))
+        self.assertFalse(bitset.test(63))
+
+        bitset.unset(64)
+        bitset.toggle(0)
+        bitset.toggle(1)
+        self.assertEqual(bitset.to_int(), 0b10 | (1 << 129))
+
+        bitset[5] = True
+        self.assertTrue(bitset[5])
+        bitset[5] = False
+        self.assertFalse(bitset[5])
+
+        with self.assertRaises(IndexError):
+            bitset.set(130)
+        with self.assertRaises(IndexError):
+            bitset.test(-1)
+
+    def test_random(self):
+        NUM_TESTS_RUN = 50
+        NUM_OPERATIONS = 50
+        MAX_LENGTH = 500
+        for _ in range(NUM_TESTS_RUN):
+            length = random.randint(1, MAX_LENGTH)
+            bitset = Bitset(length)
+            x = 0
+            for _ in range(NUM_OPERATIONS):
+                i = random.randrange(length)
+                operation = random.choice(["set", "unset", "toggle"])
+                getattr(bitset, operation)(i)
+                x = getattr(bitmanip, operation + "_bit")(x, i)
+            self.assertEqual(bitset.to_int(), x)
+            self.assertEqual(bitset.count(), bin(x).count("1"))
+            self.assertEqual(list(bitset.iter_set_bits()),
+                             list(bitmanip.iter_set_bits(x)))
+            self.assertEqual(Bitset.from_int(x, length), bitset)
+
+    def test_fill(self):
+        NUM_TESTS_RUN = 100
+        for _ in range(NUM_TESTS_RUN):
+            length = random.randint(0, 300)
+            x = random.getrandbits(length) if length else 0
+            bitset = Bitset.from_int(x, length)
+            start = random.randint(0, length)
+            stop = random.randint(start, length)
+            value = random.random() < 0.5
+
+            bitset.fill(start, stop, value)
+            mask = bitmanip.ones(stop - start, start)
+            self.assertEqual(bitset.to_int(), x | mask if value else x & ~mask)
+
+        bitset = Bitset(100)
+        bitset.fill()
+        self.assertEqual(bitset.to_int(), bitmanip.ones(100))
+        with self.assertRaises(IndexError):
+            bitset.fill(0, 101)
+
+    def test_operators(self):
+        length = 1000
+        x = random.getrandbits(length)
+        y = random.getrandbits(length)
+        bitset_x = Bitset.from_int(x, length)
+        bitset_y = Bitset.from_int(y, length)
+
+        self.assertEqual((bitset_x & bitset_y).to_int(), x & y)
+        self.assertEqual((bitset_x | bitset_y).to_int(), x | y)
+        self.assertEqual((bitset_x ^ bitset_y).to_int(), x ^ y)
+        self.assertEqual(bitset_x.to_int(), x)
+
+        words = bitset_x._words
+        bitset_x ^= bitset_y
+        self.assertEqual(bitset_x.to_int(), x ^ y)
+        self.assertIs(bitset_x._words, words)
+        bitset_x &= bitset_y
+        self.assertEqual(bitset_x.to_int(), (x ^ y) & y)
+        bitset_x |= bitset_y
+        self.assertEqual(bitset_x.to_int(), y)
+
+        with self.assertRaises(ValueError):
+            bitset_x |= Bitset(10)
+
+    def test_to_bit_vector(self):
+        x = random.getrandbits(1000)
+        bitset = Bitset.from_int(x, 1000)
+        bit_vector = bitset.to_bit_vector()
+        self.assertEqual(bit_vector.to_int(), x)
+        self.assertEqual(bit_vector.rank(1000), bin(x).count("1"))
+
+    def test_copy(self):
+        class SubBitset(Bitset):
+            pass
+
+        bitset = SubBitset.from_int(0b1011, 10)
+        bitset_copy = bitset.copy()
+        self.assertIs(type(bitset_copy), SubBitset)
+        self.assertEqual(bitset_copy, bitset)
+        bitset_copy.set(9)
+        self.assertFalse(bitset.test(9))
+        self.assertIs(type(bitset | bitset), SubBitset)
+
+        with self.assertRaises(TypeError):
+            hash(bitset)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
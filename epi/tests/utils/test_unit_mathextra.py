@@ -0,0 +1,557 @@
+import unittest
+from epi.utils.mathextra import *
+from epi.utils import mathextra
+from epi.tests.helpers import random_rectangle
+from unittest import mock
+import array, copy, math, operator, os, pickle, random, tempfile
+
+class PrimeSieve_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.MAX_NUMBER = 5000
+        self.PRIMES = list(generate_primes(self.MAX_NUMBER))
+
+    def test_extend(self):
+        sieve = PrimeSieve()
+        for n in sorted(random.sample(range(self.MAX_NUMBER + 1), 20)):
+            sieve.extend(n)
+            self.assertEqual(list(sieve.primes(n)),
+                             [p for p in self.PRIMES if p <= n])
+        self.assertEqual(list(PrimeSieve(1).primes(1)), [])
+        self.assertEqual(list(PrimeSieve(2).primes(2)), [2])
+
+    def test_primes_start(self):
+        sieve = PrimeSieve(100)
+        self.assertEqual(list(sieve.primes(100, 50)),
+                         [53, 59, 61, 67, 71, 73, 79, 83, 89, 97])
+        self.assertEqual(list(sieve.primes(7, 2)), [2, 3, 5, 7])
+
+    def test_is_prime(self):
+        sieve = PrimeSieve()
+        for x in range(-1, self.MAX_NUMBER + 1):
+            self.assertEqual(sieve.is_prime(x), is_prime(x))
+
+    def test_save_load(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "primes.bin")
+
+        sieve = PrimeSieve(self.MAX_NUMBER)
+        sieve.save(path)
+
+        loaded = PrimeSieve()
+        loaded.load(path)
+        self.assertEqual(loaded.limit, self.MAX_NUMBER)
+        self.assertEqual(list(loaded.primes(self.MAX_NUMBER)), self.PRIMES)
+        for x in range(self.MAX_NUMBER + 1):
+            self.assertEqual(loaded.is_prime(x), is_prime(x))
+
+        loaded.extend(2 * self.MAX_NUMBER)
+        self.assertEqual(list(loaded.primes(2 * self.MAX_NUMBER)),
+                         list(generate_primes(2 * self.MAX_NUMBER)))
+
+    def load_saved(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "primes.bin")
+        PrimeSieve(self.MAX_NUMBER).save(path)
+
+        loaded = PrimeSieve()
+        loaded.load(path)
+        return loaded
+
+    def test_load_primes_start(self):
+        loaded = self.load_saved()
+        for unpack_bytes in [1, 3, mathextra.PRIMES_UNPACK_BYTES]:
+            with mock.patch.object(mathextra, "PRIMES_UNPACK_BYTES",
+                                   unpack_bytes):
+                for (n, start) in [(self.MAX_NUMBER, 1), (100, 50), (7, 2),
+                                   (2, 1), (1, 1), (50, 60),
+                                   (self.MAX_NUMBER - 3, 17),
+                                   (self.MAX_NUMBER, 1000)]:
+                    self.assertEqual(list(loaded.primes(n, start)),
+                                     [p for p in self.PRIMES
+                                      if start <= p <= n])
+
+    def test_load_extend_while_iterating(self):
+        loaded = self.load_saved()
+        primes = loaded.primes(100)
+        self.assertEqual(next(primes), 2)
+        self.assertEqual(next(primes), 3)
+        self.assertTrue(loaded.is_prime(2 * self.MAX_NUMBER + 9))
+        self.assertEqual(list(primes), [p for p in self.PRIMES
+                                        if 5 <= p <= 100])
+
+    def test_generate_primes_cached(self):
+        self.assertEqual(list(generate_primes_cached(self.MAX_NUMBER)),
+                         self.PRIMES)
+        self.assertEqual(list(generate_primes_cached(100)),
+                         [p for p in self.PRIMES if p <= 100])
+
+class is_prime_miller_rabin_Test(unittest.TestCase):
+
+    def test_is_prime_miller_rabin(self):
+        for x in range(-1, 5000):
+            self.assertEqual(is_prime_miller_rabin(x), is_prime(x))
+
+        self.assertTrue(is_prime_miller_rabin(2**61 - 1))
+        self.assertTrue(is_prime_miller_rabin(2**89 - 1))
+        self.assertFalse(is_prime_miller_rabin(2**67 - 1))
+        # strong pseudoprimes to the first few prime bases
+        self.assertFalse(is_prime_miller_rabin(3215031751))
+        self.assertFalse(is_prime_miller_rabin(3825123056546413051))
+
+class is_prime_many_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.VALUES = list(range(-5, 5000))
+        self.VALUES += [random.getrandbits(40) for _ in range(200)]
+        self.ANSWER = bytearray(is_prime(x) for x in self.VALUES)
+
+    def test_is_prime_many(self):
+        self.assertEqual(is_prime_many(self.VALUES, 1), self.ANSWER)
+        self.assertEqual(is_prime_many(iter(self.VALUES), 1), self.ANSWER)
+        self.assertEqual(is_prime_many([]), bytearray())
+
+    def test_is_prime_many_parallel(self):
+        self.assertEqual(is_prime_many(self.VALUES, 2, 0), self.ANSWER)
+
+class prime_count_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.PRIMES = list(generate_primes(200000))
+
+    def test_prime_count(self):
+        for n in list(range(-1, 500)) + [199999, 200000]:
+            self.assertEqual(prime_count(n),
+                             sum(1 for p in self.PRIMES if p <= n))
+        self.assertEqual(prime_count(10**8), 5761455)
+
+    def test_prime_count_shared_sieve(self):
+        limit = prime_sieve.limit
+        self.assertEqual(prime_count(10**9), 50847534)
+        self.assertLessEqual(prime_sieve.limit, max(limit, 10**5))
+
+    def test_generate_primes_segmented(self):
+        with mock.patch.object(mathextra, "SIEVE_SEGMENT_SIZE", 7):
+            for (n, start) in [(1000, 1), (1000, 500), (2, 1), (1, 1),
+                               (100, 200)]:
+                self.assertEqual(list(generate_primes_segmented(n, start)),
+                                 [p for p in self.PRIMES if start <= p <= n])
+
+    def test_nth_prime(self):
+        for k in list(range(1, 500)) + [len(self.PRIMES)]:
+            self.assertEqual(nth_prime(k), self.PRIMES[k - 1])
+        self.assertEqual(nth_prime(10**6), 15485863)
+        self.assertRaises(ValueError, nth_prime, 0)
+
+    def test_sieve_segment(self):
+        for (low, high) in [(0, 100), (1, 2), (2, 3), (1000, 2000),
+                            (150000, 200001), (10, 10)]:
+            segment = [p for p in self.PRIMES if low <= p < high]
+            flags = sieve_segment(low, high)
+            self.assertEqual(len(flags), high - low)
+            self.assertEqual([low + i for (i, flag) in enumerate(flags)
+                              if flag], segment)
+
+class n_choose_r_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.ARGUMENTS = [(n, r) for n in range(-1, 60) for r in range(-1, n + 2)]
+        self.ARGUMENTS += [(10000, 5000), (10**5, 37), (2000, 1999)]
+
+    def assertNChooseR(self, n_choose_r_function):
+        for (n, r) in self.ARGUMENTS:
+            answer = math.comb(n, r) if (0 <= r <= n) else 0
+            self.assertEqual(n_choose_r_function(n, r), answer)
+
+    def test_n_choose_r(self):
+        self.assertNChooseR(n_choose_r)
+
+    def test_n_choose_r_dispatch(self):
+        with mock.patch.object(mathextra, "n_choose_r_prime_exponents",
+                               wraps=n_choose_r_prime_exponents) as prime:
+            for (n, r) in [(100, 41), (100, 50), (300, 150), (1000, 200),
+                           (1000, 800), (3000, 300), (10**6, 319)]:
+                self.assertEqual(n_choose_r(n, r), math.comb(n, r))
+            self.assertEqual(prime.call_count, 0)
+
+            for (n, r) in [(1000, 500), (10**5, 5000), (10**5, 95000)]:
+                self.assertEqual(n_choose_r(n, r), math.comb(n, r))
+            self.assertEqual(prime.call_count, 3)
+
+    def test_n_choose_r_fraction(self):
+        self.assertNChooseR(n_choose_r_fraction)
+
+    def test_n_choose_r_multiplicative(self):
+        self.assertNChooseR(n_choose_r_multiplicative)
+
+    def test_n_choose_r_prime_exponents(self):
+        self.assertNChooseR(n_choose_r_prime_exponents)
+
+    def test_n_choose_r_prime_exponents_shared_sieve(self):
+        limit = prime_sieve.limit
+        n, r = 3 * 10**6, 5000
+        self.assertEqual(n_choose_r_prime_exponents(n, r),
+                         n_choose_r_multiplicative(n, r))
+        self.assertLessEqual(prime_sieve.limit, max(limit, 10**4))
+
+    def test_n_choose_r_cached(self):
+        self.assertNChooseR(n_choose_r_cached)
+
+    def test_balanced_product(self):
+        self.assertEqual(balanced_product([]), 1)
+        self.assertEqual(balanced_product(range(1, 100)), math.factorial(99))
+
+class BinomialModTable_Test(unittest.TestCase):
+
+    def test_n_choose_r(self):
+        for p in [2, 3, 7, 101, 1000000007]:
+            table = BinomialModTable(300, p)
+            for n in range(301):
+                for r in range(-1, n + 2):
+                    answer = (math.comb(n, r) if (0 <= r <= n) else 0) % p
+                    self.assertEqual(table.n_choose_r(n, r), answer)
+
+    def test_n_choose_r_lucas(self):
+        table = BinomialModTable(12, 13)
+        for (n, r) in [(10**6, 1234), (13**4 + 5, 13**2 + 3), (10**5, 10**5)]:
+            self.assertEqual(table.n_choose_r(n, r), math.comb(n, r) % 13)
+
+        table = BinomialModTable(5, 13)
+        self.assertRaises(ValueError, table.n_choose_r, 6, 2)
+
+    def test_n_choose_r_many(self):
+        table = BinomialModTable(1000, 1000003)
+        pairs = [(1000, 500), (10, 3), (5, 6)]
+        self.assertEqual(list(table.n_choose_r_many(pairs)),
+                         [math.comb(n, r) % 1000003 if (r <= n) else 0
+                          for (n, r) in pairs])
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, BinomialModTable, 10, 12)
+        self.assertRaises(ValueError, BinomialModTable, -1, 13)
+
+class int_sqrt_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUMBERS = list(range(2000))
+        self.NUMBERS += [random.getrandbits(random.randint(1, 20000))
+                         for _ in range(200)]
+        self.NUMBERS += [(1 << 4000) - 1, 1 << 4000,
+                         ((1 << 3000) + 1)**2, ((1 << 3000) + 1)**2 - 1]
+
+    def test_int_sqrt(self):
+        for x in self.NUMBERS:
+            self.assertEqual(int_sqrt(x), math.isqrt(x))
+        self.assertRaises(ValueError, int_sqrt, -1)
+
+    def test_int_sqrt_remainder(self):
+        for x in self.NUMBERS:
+            s, r = int_sqrt_remainder(x)
+            self.assertEqual(s, math.isqrt(x))
+            self.assertEqual(r, x - s*s)
+
+    def test_int_sqrt_karatsuba(self):
+        for x in self.NUMBERS:
+            self.assertEqual(int_sqrt_karatsuba(x), math.isqrt(x))
+
+class int_cbrt_Test(unittest.TestCase):
+
+    def test_int_cbrt(self):
+        for x in range(2000):
+            root = int_cbrt(x)
+            self.assertTrue(root**3 <= x < (root + 1)**3)
+        self.assertEqual(int_cbrt(10**60), 10**20)
+        self.assertEqual(int_cbrt(10**60 - 1), 10**20 - 1)
+
+class greatest_common_divisor_Test(unittest.TestCase):
+
+    def test_greatest_common_divisor_rand(self):
+        NUM_TESTS_RUN = 100
+        MAX_NUMBER = 1 << 64
+        for _ in range(NUM_TESTS_RUN):
+            x = random.randint(0, MAX_NUMBER)
+            y = random.randint(0, MAX_NUMBER)
+            self.assertEqual(greatest_common_divisor(x, y), math.gcd(x, y))
+
+class factorize_Test(unittest.TestCase):
+
+    def assertFactorization(self, n, factors):
+        self.assertEqual(math.prod(p**e for (p, e) in factors), n)
+        self.assertTrue(all(is_prime_miller_rabin(p) for (p, _) in factors))
+        self.assertEqual([p for (p, _) in factors],
+                         sorted(p for (p, _) in factors))
+
+    def test_factorize(self):
+        self.assertEqual(factorize(1), ())
+        self.assertEqual(factorize(360), ((2, 3), (3, 2), (5, 1)))
+        self.assertEqual(factorize(2147483647 * 4294967291),
+                         ((2147483647, 1), (4294967291, 1)))
+        self.assertEqual(factorize(1000003**3), ((1000003, 3),))
+        self.assertRaises(ValueError, factorize, 0)
+
+        for n in range(1, 3000):
+            self.assertFactorization(n, factorize(n))
+
+    def test_factorize_rand(self):
+        NUM_TESTS_RUN = 50
+        for _ in range(NUM_TESTS_RUN):
+            n = random.getrandbits(64) + 1
+            self.assertFactorization(n, factorize(n))
+
+    def test_factorize_many(self):
+        values = [12, 97, 12, 1 << 40, 1]
+        self.assertEqual(factorize_many(values),
+                         [factorize(x) for x in values])
+
+class SlotsPoint_Test(unittest.TestCase):
+
+    def assert_arithmetic(self, point_class, reference_class):
+        p = point_class(3, -4)
+        q = point_class(1, 2)
+        p_reference = reference_class(3, -4)
+        q_reference = reference_class(1, 2)
+
+        for (answer, expected) in [(p + q, p_reference + q_reference),
+                                   (p - q, p_reference - q_reference),
+                                   (p * 2, p_reference * 2),
+                                   (2.5 * p, 2.5 * p_reference),
+                                   (p * q, p_reference * q_reference),
+                                   (p / 2, p_reference / 2),
+                                   (p / q, p_reference / q_reference),
+                                   (p // 2, p_reference // 2),
+                                   (p // q, p_reference // q_reference),
+                                   (-p, -p_reference),
+                                   (abs(p), abs(p_reference)),
+                                   (+p, +p_reference),
+                                   (sum([p, q]), sum([p_reference,
+                                                      q_reference]))]:
+            self.assertIs(type(answer), point_class)
+            self.assertEqual(answer, expected)
+
+        self.assertEqual(p.norm(), 5)
+        self.assertEqual(p.dot(q), p_reference.dot(q_reference))
+        self.assertTrue(point_class(2, -1).is_orthogonal(q))
+        self.assertEqual(p.region, p_reference.region)
+        self.assertEqual(point_class(0, -1).region,
+                         AbstractPoint.Region.NEGATIVE_Y)
+        self.assertFalse(hasattr(p, "__dict__"))
+
+    def test_frozen_slots_point(self):
+        self.assert_arithmetic(FrozenSlotsPoint, FrozenPoint)
+
+        p = FrozenSlotsPoint(1, 2)
+        with self.assertRaises(TypeError):
+            p.x = 3
+        with self.assertRaises(TypeError):
+            del p.y
+        with self.assertRaises(TypeError):
+            p.z = 3
+        self.assertEqual(hash(p), hash(FrozenPoint(1, 2)))
+        self.assertEqual(len({p, FrozenSlotsPoint(1, 2)}), 1)
+
+        p.region
+        for q in [copy.copy(p), copy.deepcopy(p),
+                  pickle.loads(pickle.dumps(p))]:
+            self.assertIs(type(q), FrozenSlotsPoint)
+            self.assertEqual(q, p)
+            self.assertEqual(q.region, p.region)
+            with self.assertRaises(TypeError):
+                q.x = 3
+
+    def test_mutable_slots_point(self):
+        self.assert_arithmetic(MutableSlotsPoint, MutablePoint)
+
+        p = MutableSlotsPoint(1, 2)
+        p += MutableSlotsPoint(1, 1)
+        p *= 3
+        p.y -= 1
+        self.assertEqual(p, MutablePoint(6, 8))
+        with self.assertRaises(AttributeError):
+            p.z = 3
+
+class PointArray_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_POINTS = 200
+        values = [0.0, 1.5, -2.0, 3.0, -0.5]
+        self.POINTS = [FrozenPoint(random.choice(values),
+                                   random.choice(values))
+                       for _ in range(self.NUM_POINTS)]
+        self.POINT_ARRAY = PointArray.from_points(self.POINTS)
+
+    def assert_points(self, point_array, points):
+        self.assertIsInstance(point_array, PointArray)
+        self.assertEqual(list(point_array), list(points))
+
+    def test_constructor(self):
+        x = array.array('d', [1.0, 2.0])
+        y = array.array('d', [3.0, 4.0])
+        point_array = PointArray(x, y)
+        x[0] = 5.0
+        self.assertEqual(point_array[0], FrozenPoint(5.0, 3.0))
+        self.assertEqual(PointArray([5, 2], (3, 4)), point_array)
+        self.assertEqual(len(PointArray()), 0)
+        with self.assertRaises(ValueError):
+            PointArray([1.0], [])
+
+    def test_getitem(self):
+        for i in [0, 1, self.NUM_POINTS - 1, -1]:
+            self.assertIs(type(self.POINT_ARRAY[i]),
+                          PointArray.point_class)
+            self.assertEqual(self.POINT_ARRAY[i], self.POINTS[i])
+        with self.assertRaises(IndexError):
+            self.POINT_ARRAY[self.NUM_POINTS]
+        self.assert_points(self.POINT_ARRAY, self.POINTS)
+
+    def test_slice(self):
+        view = self.POINT_ARRAY[10:50:3]
+        self.assert_points(view, self.POINTS[10:50:3])
+        self.assertIs(view.x.obj, self.POINT_ARRAY.x.obj)
+        self.POINT_ARRAY.x[10] = 7.0
+        self.assertEqual(view[0].x, 7.0)
+
+    def test_arithmetic(self):
+        other = PointArray.from_points(reversed(self.POINTS))
+        point = FrozenPoint(1.0, -2.0)
+        self.assert_points(self.POINT_ARRAY + other,
+                           map(operator.add, self.POINTS,
+                               reversed(self.POINTS)))
+        self.assert_points(self.POINT_ARRAY - other,
+                           map(operator.sub, self.POINTS,
+                               reversed(self.POINTS)))
+        self.assert_points(self.POINT_ARRAY + point,
+                           [p + point for p in self.POINTS])
+        self.assert_points(self.POINT_ARRAY - point,
+                           [p - point for p in self.POINTS])
+        self.assert_points(self.POINT_ARRAY.scale(2.5),
+                           [p * 2.5 for p in self.POINTS])
+        self.assert_points(3 * self.POINT_ARRAY,
+                           [3 * p for p in self.POINTS])
+        self.assert_points(-self.POINT_ARRAY, [-p for p in self.POINTS])
+        with self.assertRaises(ValueError):
+            self.POINT_ARRAY + self.POINT_ARRAY[1:]
+
+    def test_dot_norm(self):
+        other = PointArray.from_points(reversed(self.POINTS))
+        point = FrozenPoint(1.0, -2.0)
+        self.assertEqual(list(self.POINT_ARRAY.dot(other)),
+                         [p.dot(q) for (p, q) in zip(self.POINTS,
+                                                     reversed(self.POINTS))])
+        self.assertEqual(list(self.POINT_ARRAY.dot(point)),
+                         [p.dot(point) for p in self.POINTS])
+        for (norm, p) in zip(self.POINT_ARRAY.norm(), self.POINTS):
+            self.assertAlmostEqual(norm, p.norm())
+
+    def test_regions(self):
+        points = self.POINTS + [FrozenPoint(x, y)
+                                for x in [-1.0, 0.0, 1.0, math.nan]
+                                for y in [-1.0, 0.0, 1.0, math.nan]]
+        point_array = PointArray.from_points(points)
+        self.assertEqual(point_array.regions(), [p.region for p in points])
+        self.assertEqual(list(point_array.region_values()),
+                         [p.region.value for p in points])
+
+class RectangleArray_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_RECTANGLES = 150
+        self.RECTANGLES = [random_rectangle(40, 8, integral=True)
+                           for _ in range(self.NUM_RECTANGLES)]
+        self.OTHER_RECTANGLES = [random_rectangle(40, 8, integral=True)
+                                 for _ in range(self.NUM_RECTANGLES)]
+        self.RECTANGLE_ARRAY = RectangleArray.from_rectangles(self.RECTANGLES)
+        self.OTHER_RECTANGLE_ARRAY = RectangleArray.from_rectangles(
+                self.OTHER_RECTANGLES)
+
+    def test_getitem(self):
+        self.assertEqual(len(self.RECTANGLE_ARRAY), self.NUM_RECTANGLES)
+        self.assertEqual(list(self.RECTANGLE_ARRAY), self.RECTANGLES)
+        self.assertEqual(self.RECTANGLE_ARRAY[-1], self.RECTANGLES[-1])
+        self.assertEqual(list(self.RECTANGLE_ARRAY[5:20]),
+                         self.RECTANGLES[5:20])
+        self.assertEqual(list(self.RECTANGLE_ARRAY.take([3, 1, 3])),
+                         [self.RECTANGLES[i] for i in [3, 1, 3]])
+        self.assertIsNone(RectangleArray([1], [1], [0], [2])[0])
+        self.assertIs(RectangleArray.as_rectangle_array(self.RECTANGLE_ARRAY),
+                      self.RECTANGLE_ARRAY)
+        with self.assertRaises(ValueError):
+            RectangleArray([0], [0], [1], [])
+
+    def test_intersects_many(self):
+        self.assertEqual(list(self.RECTANGLE_ARRAY.intersects_many(
+                                      self.OTHER_RECTANGLE_ARRAY)),
+                         [r.intersects(s) for (r, s) in
+                          zip(self.RECTANGLES, self.OTHER_RECTANGLES)])
+        rectangle = self.OTHER_RECTANGLES[0]
+        self.assertEqual(list(self.RECTANGLE_ARRAY.intersects_many(rectangle)),
+                         [r.intersects(rectangle) for r in self.RECTANGLES])
+        with self.assertRaises(ValueError):
+            self.RECTANGLE_ARRAY.intersects_many(self.RECTANGLE_ARRAY[1:])
+
+    def test_intersection_many(self):
+        self.assertEqual(list(self.RECTANGLE_ARRAY.intersection_many(
+                                      self.OTHER_RECTANGLE_ARRAY)),
+                         [r.intersection(s) for (r, s) in
+                          zip(self.RECTANGLES, self.OTHER_RECTANGLES)])
+        rectangle = self.OTHER_RECTANGLES[0]
+        self.assertEqual(list(self.RECTANGLE_ARRAY.intersection_many(
+                                      rectangle)),
+                         [r.intersection(rectangle) for r in self.RECTANGLES])
+
+    def test_bounding_box(self):
+        rectangle_array = RectangleArray([0, 2], [1, -1], [1, 5], [3, 0])
+        self.assertEqual(rectangle_array.bounding_box(),
+                         Rectangle(FrozenPoint(0, -1), 5, 4))
+        self.assertIsNone(RectangleArray().bounding_box())
+
+    def test_intersects_matrix(self):
+        expected = [[s.intersects(r) for s in self.OTHER_RECTANGLES]
+                    for r in self.RECTANGLES]
+        for block_size in [1, 7, 64, 1000]:
+            answer = self.RECTANGLE_ARRAY.intersects_matrix(
+                    self.OTHER_RECTANGLES, block_size)
+            self.assertEqual([list(row) for row in answer], expected)
+        self.assertEqual(self.RECTANGLE_ARRAY.intersects_matrix([]),
+                         [bytearray()] * self.NUM_RECTANGLES)
+
+class find_intersecting_pairs_Test(unittest.TestCase):
+
+    def assert_pairs(self, rectangles):
+        expected = [(i, j) for i in range(len(rectangles))
+                    for j in range(i + 1, len(rectangles))
+                    if rectangles[i].intersects(rectangles[j])]
+        self.assertEqual(sorted(find_intersecting_pairs(rectangles)),
+                         expected)
+
+    def test_random(self):
+        for (num_rectangles, span, size) in [(0, 10, 3), (1, 10, 3),
+                                             (50, 5, 3), (200, 40, 6),
+                                             (200, 100, 0)]:
+            rectangles = [random_rectangle(span, size, integral=True)
+                          for _ in range(num_rectangles)]
+            self.assert_pairs(rectangles)
+            self.assertEqual(sorted(find_intersecting_pairs(
+                                 RectangleArray.from_rectangles(rectangles))),
+                             sorted(find_intersecting_pairs(rectangles)))
+
+    def test_touching(self):
+        rectangle = Rectangle(FrozenPoint(0, 0), 2, 2)
+        rectangles = [rectangle,
+                      Rectangle(FrozenPoint(2, 0), 1, 1),
+                      Rectangle(FrozenPoint(2, 2), 1, 1),
+                      Rectangle(FrozenPoint(-1, 2), 1, 0),
+                      Rectangle(FrozenPoint(1, 1), 0, 0),
+                      Rectangle(FrozenPoint(0, 3), 2, 2),
+                      rectangle]
+        self.assertEqual(sorted(find_intersecting_pairs(rectangles)),
+                         [(0, 1), (0, 2), (0, 3), (0, 4), (0, 6), (1, 6),
+                          (2, 5), (2, 6), (3, 6), (4, 6)])
+        self.assert_pairs(rectangles)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import unittest
+from epi.utils.rtree import *
+from epi.utils.mathextra import FrozenPoint, Rectangle, RectangleArray
+from epi.tests.helpers import random_rectangle
+import math, os, random, tempfile
+
+class RTree_Test(unittest.TestCase):
+
+    def setUp(self):
+        self.NUM_RECTANGLES = 500
+        self.NUM_QUERIES = 50
+        self.RECTANGLES = [random_rectangle(100, 10, integral=True)
+                           for _ in range(self.NUM_RECTANGLES)]
+
+    @staticmethod
+    def distance(rectangle, point):
+        x0 = rectangle.lower_left_point.x
+        y0 = rectangle.lower_left_point.y
+        x1 = x0 + rectangle.width
+        y1 = y0 + rectangle.height
+        return math.hypot(max(x0 - point.x, 0, point.x - x1),
+                          max(y0 - point.y, 0, point.y - y1))
+
+    def assert_queries(self, tree, rectangles):
+        self.assertEqual(len(tree), len(rectangles))
+        for _ in range(self.NUM_QUERIES):
+            window = random_rectangle(100, 20, integral=True)
+            self.assertEqual(sorted(tree.query_window(window)),
+                             [i for (i, rectangle) in enumerate(rectangles)
+                              if rectangle.intersects(window)])
+
+            point = FrozenPoint(random.randint(0, 100), random.randint(0, 100))
+            self.assertEqual(sorted(tree.query_point(point)),
+                             [i for (i, rectangle) in enumerate(rectangles)
+                              if rectangle.intersects(Rectangle(point, 0, 0))])
+
+            k = random.randint(1, 10)
+            nearest = tree.query_nearest(point, k)
+            self.assertEqual(len(nearest), min(k, len(rectangles)))
+            self.assertEqual(len(set(nearest)), len(nearest))
+            expected = sorted(self.distance(rectangle, point)
+                              for rectangle in rectangles)[:k]
+            self.assertEqual([self.distance(rectangles[i], point)
+                              for i in nearest], expected)
+
+    def test_queries(self):
+        for node_capacity in [2, 3, 16]:
+            for num_rectangles in [0, 1, node_capacity,
+                                   node_capacity + 1, self.NUM_RECTANGLES]:
+                rectangles = self.RECTANGLES[:num_rectangles]
+                tree = RTree(rectangles, node_capacity)
+                self.assertEqual(tree.node_capacity, node_capacity)
+                self.assert_queries(tree, rectangles)
+
+    def test_rectangle_array(self):
+        rectangle_array = RectangleArray.from_rectangles(self.RECTANGLES)
+        self.assert_queries(RTree(rectangle_array), self.RECTANGLES)
+
+    def test_touching(self):
+        rectangles = [Rectangle(FrozenPoint(0, 0), 2, 2),
+                      Rectangle(FrozenPoint(2, 2), 1, 1),
+                      Rectangle(FrozenPoint(3, 0), 1, 1)]
+        tree = RTree(rectangles, 2)
+        self.assertEqual(sorted(tree.query_point(FrozenPoint(2, 2))), [0, 1])
+        self.assertEqual(tree.query_point(FrozenPoint(2.5, 0)), [])
+        self.assertEqual(
+            sorted(tree.query_window(Rectangle(FrozenPoint(2, 1), 1, 0))),
+            [0, 2])
+        self.assertEqual(tree.query_nearest(FrozenPoint(3.5, 0.5), 2), [2, 0])
+
+    def test_node_capacity(self):
+        with self.assertRaises(ValueError):
+            RTree(self.RECTANGLES, 1)
+
+    def test_buffer(self):
+        tree = RTree(self.RECTANGLES)
+        loaded = RTree.from_buffer(tree.to_bytes())
+        self.assertEqual(loaded.num_nodes, tree.num_nodes)
+        self.assert_queries(loaded, self.RECTANGLES)
+        self.assertEqual(RTree.from_buffer(RTree().to_bytes()).query_point(
+                             FrozenPoint(0, 0)), [])
+        with self.assertRaises(ValueError):
+            RTree.from_buffer(bytes(64))
+
+    def test_save_load(self):
+        tree = RTree(self.RECTANGLES)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rtree")
+            tree.save(path)
+            loaded = RTree.load(path)
+            self.assert_queries(loaded, self.RECTANGLES)
+            loaded.close()
+
+            with open(path, "wb") as f:
+                f.write(bytes(64))
+            with self.assertRaises(ValueError):
+                RTree.load(path)
+
+def main():
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+Vector versions of the bitmanip functions. Each function takes an
+array('Q') of 64-bit words (or any iterable of whole numbers < 2**64)
+and returns a new array('Q') with the bitmanip function applied to every
+word. The results are the same as the bitmanip results modulo 2**64,
+since that is all that fits in a word.
+
+Instead of looping over the words in Python, the words are packed into
+one big int with every word in its own 64-bit lane:
+x == words[0] | (words[1] << 64) | (words[2] << 128) | ...
+and the bitmanip formula is applied to the big int once, so the loop
+over the words happens in C inside the big int operators (SWAR - SIMD
+within a register). Bitwise operators never move bits between lanes.
+Shifts and arithmetic do, so they are masked to stay inside their lane.
+Packing and unpacking are int.from_bytes() and int.to_bytes() on the
+array buffer, which are also done in C.
+
+The words are packed CHUNK_WORDS at a time rather than all at once.
+Every big int operator makes a new int, so small chunks keep the
+temporaries small (and in cache) no matter how many words there are,
+and the lane constants only have to be built for a couple of lengths.
+"""
+
+from epi.utils import bitmanip, python
+from array import array
+import functools, sys
+
+WORD_BITS = 64
+WORD_BYTES = WORD_BITS // 8
+WORD_MASK = bitmanip.ones(WORD_BITS)
+HIGH_BIT = 1 << (WORD_BITS - 1)
+
+CHUNK_WORDS = 1 << 12
+
+def as_words(words):
+    """
+    Return words as an array('Q'). If it already is one, it is returned
+    as is, without a copy.
+    """
+
+    if (isinstance(words, array) and words.typecode == 'Q'):
+        return words
+    return array('Q', words)
+
+def to_int(words):
+    """
+    Return words packed into a single int with words[i] in bits
+    [64 * i, 64 * (i + 1)).
+
+    array('Q') stores words in the native byte order, so reading the
+    whole buffer in the native byte order keeps each word in one lane. On
+    a big-endian machine words[0] ends up as the most significant word
+    instead, which doesn't matter since every lane is treated the same,
+    as long as from_int() uses the same byte order.
+    """
+
+    return int.from_bytes(as_words(words).tobytes(), sys.byteorder)
+
+def from_int(x, length):
+    """
+    Return the length words packed in x (see to_int()) as an array('Q').
+    Bits of x above length words are ignored.
+    """
+
+    x &= bitmanip.ones(length * WORD_BITS)
+    words = array('Q')
+    words.frombytes(x.to_bytes(length * WORD_BYTES, sys.byteorder))
+    return words
+
+@functools.lru_cache(maxsize=1 << 8)
+def lanes(word, length):
+    """
+    Return word repeated in every one of length lanes, packed like
+    to_int(). The result is cached since the same few constants are used
+    for every chunk.
+    """
+
+    return to_int(array('Q', [word & WORD_MASK]) * length)
+
+def _shift_left(x, k, length):
+    """
+    Return every lane of x shifted left by k, dropping the bits shifted
+    out of the top of each lane.
+    """
+
+    if (k >= WORD_BITS):
+        return 0
+    return (x << k) & lanes(WORD_MASK << k, length)
+
+def _shift_right(x, k, length):
+    """
+    Return every lane of x shifted right by k, dropping the bits shifted
+    in from the lane above.
+    """
+
+    if (k >= WORD_BITS):
+        return 0
+    return (x >> k) & lanes(bitmanip.ones(WORD_BITS - k), length)
+
+def _add(x, y, length):
+    """
+    Return x + y in every lane, modulo 2**64.
+
+    The top bit of each lane is taken out before adding so the sum of
+    the low 63 bits fits in the lane and can't carry into the lane above.
+    Then the top bit of the sum is the xor of both top bits and the
+    carry into it, which is already in the sum.
+    """
+
+    high = lanes(HIGH_BIT, length)
+    low = lanes(~HIGH_BIT, length)
+    return ((x & low) + (y & low)) ^ ((x ^ y) & high)
+
+def _subtract(x, y, length):
+    """
+    Return x - y in every lane, modulo 2**64.
+
+    This is _add() flipped around. The top bit of each lane of x is set
+    before subtracting so subtracting the low 63 bits of y can't borrow
+    from the lane above. Then the top bit of the difference is fixed up
+    with the top bits of x and y.
+    """
+
+    high = lanes(HIGH_BIT, length)
+    low = lanes(~HIGH_BIT, length)
+    return ((x | high) - (y & low)) ^ ((x ^ y ^ high) & high)
+
+def _map(words, function):
+    """
+    Return the words of function(x, length) for every chunk x of
+    length words of words, packed with to_int().
+    """
+
+    answer = array('Q')
+    view = memoryview(as_words(words))
+    for start in range(0, len(view), CHUNK_WORDS):
+        chunk = view[start:start + CHUNK_WORDS]
+        length = len(chunk)
+        x = function(int.from_bytes(chunk, sys.byteorder), length)
+        x &= lanes(WORD_MASK, length)
+        answer.frombytes(x.to_bytes(length * WORD_BYTES, sys.byteorder))
+    return answer
+
+def get_bit(words, k):
+    """
+    Return the k-th bit of each word.
+    """
+
+    return _map(words, lambda x, length: _shift_right(x, k, length)
+                                         & lanes(1, length))
+
+def get_bit_position(words, k):
+    """
+    Return the k-th bit of each word, leaving it in its position.
+    """
+
+    return _map(words, lambda x, length: x & lanes(1 << k, length))
+
+def set_bit(words, k):
+    """
+    Return each word with the k-th bit set.
+    """
+
+    return _map(words, lambda x, length: x | lanes(1 << k, length))
+
+def unset_bit(words, k):
+    """
+    Return each word with the k-th bit unset.
+    """
+
+    return _map(words, lambda x, length: x & ~lanes(1 << k, length))
+
+def toggle_bit(words, k):
+    """
+    Return each word with the k-th bit toggled.
+    """
+
+    return _map(words, lambda x, length: x ^ lanes(1 << k, length))
+
+def drop_lowest_set_bit(words):
+    """
+    Return each word with the lowest set bit set to 0.
+    """
+
+    return _map(words, lambda x, length: x & _subtract(x, lanes(1, length),
+                                                       length))
+
+def drop_lowest_unset_bit(words):
+    """
+    Return each word with the lowest unset bit set to 1.
+    """
+
+    return _map(words, lambda x, length: x | _add(x, lanes(1, length),
+                                                  length))
+
+def right_extend_lowest_set_bit(words):
+    """
+    Return each word with the lowest set bit extended to the right.
+    """
+
+    return _map(words, lambda x, length: x | _subtract(x, lanes(1, length),
+                                                       length))
+
+def right_extend_lowest_unset_bit(words):
+    """
+    Return each word with the lowest unset bit extended to the right.
+    """
+
+    return _map(words, lambda x, length: x & _add(x, lanes(1, length),
+                                                  length))
+
+def get_lowest_set_bit(words):
+    """
+    Return each word with only the lowest set bit set high.
+
+    -x == ~x + 1 like bitmanip.get_lowest_set_bit(), with ~x limited to
+    the lanes.
+    """
+
+    def function(x, length):
+        ones = lanes(1, length)
+        return x & _add(x ^ lanes(WORD_MASK, length), ones, length)
+
+    return _map(words, function)
+
+def get_lowest_unset_bit(words):
+    """
+    Return each word with only the lowest unset bit set high.
+    """
+
+    def function(x, length):
+        ones = lanes(1, length)
+        return (x ^ lanes(WORD_MASK, length)) & _add(x, ones, length)
+
+    return _map(words, function)
+
+def get_least_significant_bits(words, n):
+    """
+    Return the n least significant bits of each word.
+    """
+
+    return _map(words, lambda x, length: x & lanes(bitmanip.ones(n),
+                                                   length))
+
+def get_bits(words, k, size, offset=0):
+    """
+    Return the k-th set of size bits starting from offset of each word.
+    """
+
+    def function(x, length):
+        x = _shift_right(x, offset + k * size, length)
+        return x & lanes(bitmanip.ones(size), length)
+
+    return _map(words, function)
+
+def swap_bits_index(words, i, j=python.Parameter.OTHER_ARGUMENT):
+    """
+    Return each word with bits i and j swapped. j defaults to i + 1.
+
+    Like bitmanip.swap_bits_index(), both bits are toggled if they
+    differ. diff has a 1 in bit 0 of every lane where they differ, and
+    it is shifted up to bits i and j to toggle them.
+    """
+
+    if (j is python.Parameter.OTHER_ARGUMENT):
+        j = i + 1
+
+    def function(x, length):
+        diff = (_shift_right(x, i, length) ^ _shift_right(x, j, length)) \
+               & lanes(1, length)
+        return x ^ _shift_left(diff, i, length) ^ _shift_left(diff, j, length)
+
+    return _map(words, function)
+
+def shift_bits(words, k):
+    """
+    Return each word logically left shifted by k. k can be negative,
+    which would mean a logical right shift. This matches what
+    bitmanip.shift_bits() does.
+    """
+
+    if (k >= 0):
+        return _map(words, lambda x, length: _shift_left(x, k, length))
+    else:
+        return _map(words, lambda x, length: _shift_right(x, -k, length))
+
+def permute_bits(words, permutation):
+    """
+    Return each word with bit i moved to bit permutation[i] like
+    bitmanip.permute_bits(). len(permutation) must be <= 64.
+
+    The delta swaps of the bitmanip.compile_permutation() plan only swap
+    bit i with bit i + shift inside the permutation, so they never cross
+    into the next lane and only the masks have to be repeated per lane.
+    """
+
+    if (len(permutation) > WORD_BITS):
+        raise ValueError("len(permutation) must be <= 64.")
+
+    plan = bitmanip.compile_permutation(tuple(permutation))
+
+    def function(x, length):
+        for (mask, shift) in plan:
+            x = bitmanip.delta_swap(x, lanes(mask, length), shift)
+        return x
+
+    return _map(words, function)
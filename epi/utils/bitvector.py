@@ -0,0 +1,481 @@
+from epi.utils import bitmanip, bitmanipvector
+from array import array
+import itertools, sys
+
+def _iter_set_bits(words):
+    """
+    Yield the indices of the set bits in words, in increasing order.
+    """
+
+    for (w, word) in enumerate(words):
+        offset = w << 6
+        while (word):
+            yield offset + bitmanip.count_trailing_zeros(word)
+            word = bitmanip.drop_lowest_set_bit(word)
+
+class BitVector:
+    """
+    An immutable sequence of bits with O(1) rank() and fast select().
+
+    A multi-megabit Python int is slow to use as a bitmap since every
+    shift copies the whole number, so bitmanip.get_bit() on it is O(n).
+    The bits are kept in an array('Q') of 64-bit words instead, with bit i
+    in bit (i % 64) of _words[i // 64], so reading a bit only touches one
+    word. Bits past length in the last word are always 0.
+
+    rank(i) is the number of 1's before bit i. It uses two directories
+    built once from the word popcounts:
+    _superblock_ranks[s] == number of 1's before word s * SUPERBLOCK_WORDS
+    _word_ranks[w] == number of 1's before word w, starting from the
+    start of its superblock
+    A superblock has SUPERBLOCK_WORDS * 64 == 2**16 bits, so _word_ranks
+    fits in array('H'), which is 16 bits for every 64 bits (25% extra).
+    Then rank(i) is two lookups plus the popcount of the part of word
+    i // 64 before bit i.
+
+    select(j) is the index of the j-th 1 (counting from 0). Every
+    SELECT_SAMPLE-th 1 has the index of its word saved in _select_samples,
+    so the j-th 1 is in a word between two samples, found with a binary
+    search over the word ranks, then the bit is found inside the word.
+    """
+
+    WORD_BITS = bitmanipvector.WORD_BITS
+    SUPERBLOCK_WORDS = 1 << 10
+    SELECT_SAMPLE = 1 << 9
+
+    def __init__(self, words=(), length=None):
+        """
+        Create a bit vector of length bits from 64-bit words, least
+        significant word first. length defaults to all the bits of words.
+        words is copied unless it is already an array('Q').
+        """
+
+        words = bitmanipvector.as_words(words)
+        max_length = len(words) * self.WORD_BITS
+        if (length is None):
+            length = max_length
+        if (not (0 <= length <= max_length)):
+            raise ValueError("length must be in [0, len(words) * 64].")
+
+        number_words = -(-length // self.WORD_BITS)
+        if (number_words < len(words)):
+            words = words[:number_words]
+        last_bits = length % self.WORD_BITS
+        if (last_bits and (words[-1] >> last_bits)):
+            # Copy before clearing the bits past length, so the caller's
+            # array isn't changed.
+            words = array('Q', words)
+            words[-1] &= bitmanip.ones(last_bits)
+
+        self._words = words
+        self._length = length
+        self._build_directories()
+
+    @classmethod
+    def from_int(cls, x, length=None):
+        """
+        Return a bit vector with bit i == bitmanip.get_bit(x, i) (x >= 0).
+        length defaults to x.bit_length().
+        """
+
+        if (x < 0):
+            raise ValueError("x must be >= 0.")
+        if (length is None):
+            length = x.bit_length()
+
+        number_words = -(-length // cls.WORD_BITS)
+        return cls(bitmanipvector.from_int(x, number_words), length)
+
+    @classmethod
+    def from_bytes(cls, data, length=None):
+        """
+        Return a bit vector with the bits of data, little-endian like
+        int.from_bytes(data, "little"). length defaults to 8 * len(data).
+        """
+
+        if (length is None):
+            length = len(data) << 3
+
+        words = array('Q')
+        word_bytes = words.itemsize
+        padding = -len(data) % word_bytes
+        words.frombytes(bytes(data) + bytes(padding))
+        if (sys.byteorder == "big"):
+            words.byteswap()
+        return cls(words, length)
+
+    def _build_directories(self):
+        """
+        Build the rank and select directories from the word popcounts.
+        """
+
+        counts = bitmanip.popcount_many(self._words)
+        ranks = list(itertools.accumulate(counts, initial=0))
+
+        self._superblock_ranks = array('Q',
+            ranks[::self.SUPERBLOCK_WORDS])
+        self._word_ranks = array('H',
+            [rank - self._superblock_ranks[w // self.SUPERBLOCK_WORDS]
+             for (w, rank) in enumerate(ranks[:-1])])
+        self._count = ranks[-1]
+
+        self._select_samples = array('Q')
+        target = 0
+        for w in range(len(self._words)):
+            while (target < ranks[w + 1]):
+                self._select_samples.append(w)
+                target += self.SELECT_SAMPLE
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        """
+        Return bit i (0 or 1). Negative i counts from the end.
+        """
+
+        if (i < 0):
+            i += self._length
+        if (not (0 <= i < self._length)):
+            raise IndexError("BitVector index out of range")
+
+        return bitmanip.get_bit(self._words[i >> 6], i & 63)
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def __eq__(self, other):
+        if (not isinstance(other, BitVector)):
+            return NotImplemented
+        return (self._length == other._length) \
+               and (self._words == other._words)
+
+    def __hash__(self):
+        """
+        Return self's hash.
+
+        Hashable because immutable. Equal bit vectors have the same
+        length and words, so the hash is of those.
+        """
+
+        return hash((self._length, self._words.tobytes()))
+
+    def count(self):
+        """
+        Return the number of 1's.
+        """
+
+        return self._count
+
+    def _word_rank(self, w):
+        """
+        Return the number of 1's before word w.
+        """
+
+        return self._superblock_ranks[w // self.SUPERBLOCK_WORDS] \
+               + self._word_ranks[w]
+
+    def rank(self, i):
+        """
+        Return the number of 1's in bits [0, i), i in [0, len(self)].
+        """
+
+        if (not (0 <= i <= self._length)):
+            raise IndexError("BitVector rank index out of range")
+
+        w = i >> 6
+        if (w == len(self._words)):
+            return self._count
+
+        word = bitmanip.get_least_significant_bits(self._words[w], i & 63)
+        return self._word_rank(w) + bitmanip.popcount(word)
+
+    def rank0(self, i):
+        """
+        Return the number of 0's in bits [0, i), i in [0, len(self)].
+        """
+
+        return i - self.rank(i)
+
+    def select(self, j):
+        """
+        Return the index of the j-th 1 (counting from 0), so
+        rank(select(j)) == j and self[select(j)] == 1.
+
+        The word is found with a binary search between the select samples
+        of j, then the 1 is found inside the word by dropping the lowest
+        set bit until the j-th one is the lowest.
+        """
+
+        if (not (0 <= j < self._count)):
+            raise IndexError("BitVector select index out of range")
+
+        sample = j // self.SELECT_SAMPLE
+        low = self._select_samples[sample]
+        if (sample + 1 < len(self._select_samples)):
+            high = self._select_samples[sample + 1]
+        else:
+            high = len(self._words) - 1
+
+        # Find the last word w in [low, high] with _word_rank(w) <= j.
+        while (low < high):
+            middle = (low + high + 1) >> 1
+            if (self._word_rank(middle) <= j):
+                low = middle
+            else:
+                high = middle - 1
+
+        word = self._words[low]
+        for _ in range(j - self._word_rank(low)):
+            word = bitmanip.drop_lowest_set_bit(word)
+        return (low << 6) + bitmanip.count_trailing_zeros(word)
+
+    def iter_set_bits(self):
+        """
+        Yield the indices of the 1's in increasing order.
+        """
+
+        return _iter_set_bits(self._words)
+
+    def to_int(self):
+        """
+        Return the bits as an int, the inverse of from_int().
+        """
+
+        return bitmanipvector.to_int(self._words)
+
+    def to_bytes(self):
+        """
+        Return the bits as bytes, the inverse of from_bytes().
+        """
+
+        number_bytes = -(-self._length // 8)
+        return self.to_int().to_bytes(number_bytes, "little")
+
+    def to_memoryview(self):
+        """
+        Return a read-only memoryview of the words, without copying them.
+        """
+
+        return memoryview(self._words).toreadonly()
+
+class Bitset:
+    """
+    A mutable fixed length set of bits.
+
+    bitmanip.set_bit(), unset_bit() and toggle_bit() return a new int, so
+    updating one bit of a 10**7-bit int copies ~1.25 MB. Bitset keeps
+    the bits in an array('Q') of words like BitVector, and changes one
+    word in place instead, which is O(1).
+
+    fill() sets or clears a range of bits with one slice assignment for
+    the whole words and bitmanip masks for the partial words at each
+    end.
+
+    &=, |= and ^= pack both bitsets into ints with bitmanipvector.to_int()
+    and unpack the answer back into the same array, so the loop over the
+    words runs in C. Bitwise operators don't carry between words so no
+    lane masking is needed.
+    """
+
+    WORD_BITS = bitmanipvector.WORD_BITS
+
+    def __init__(self, length):
+        """
+        Create a bitset of length bits, all 0.
+        """
+
+        if (length < 0):
+            raise ValueError("length must be >= 0.")
+
+        self._length = length
+        self._words = array('Q', bytes(-(-length // self.WORD_BITS)
+                                       * bitmanipvector.WORD_BYTES))
+
+    @classmethod
+    def from_int(cls, x, length=None):
+        """
+        Return a bitset with bit i == bitmanip.get_bit(x, i) (x >= 0).
+        length defaults to x.bit_length().
+        """
+
+        if (x < 0):
+            raise ValueError("x must be >= 0.")
+        if (length is None):
+            length = x.bit_length()
+
+        bitset = cls(length)
+        x &= bitmanip.ones(length)
+        bitset._words = bitmanipvector.from_int(x, len(bitset._words))
+        return bitset
+
+    def to_int(self):
+        """
+        Return the bits as an int, the inverse of from_int().
+        """
+
+        return bitmanipvector.to_int(self._words)
+
+    def to_bit_vector(self):
+        """
+        Return a BitVector copy of the bits, which has rank() and select().
+        """
+
+        return BitVector(array('Q', self._words), self._length)
+
+    def copy(self):
+        """
+        Return a copy of the bitset.
+        """
+
+        bitset = self.__class__(0)
+        bitset._length = self._length
+        bitset._words = array('Q', self._words)
+        return bitset
+
+    def __len__(self):
+        return self._length
+
+    def __eq__(self, other):
+        if (not isinstance(other, Bitset)):
+            return NotImplemented
+        return (self._length == other._length) \
+               and (self._words == other._words)
+
+    """
+    Not hashable because mutable. Defining __eq__ already sets this, it
+    is spelled out so it isn't mistaken for an oversight. Use
+    to_bit_vector() for a hashable copy.
+    """
+    __hash__ = None
+
+    def _check_index(self, i):
+        if (not (0 <= i < self._length)):
+            raise IndexError("Bitset index out of range")
+
+    def test(self, i):
+        """
+        Return True if bit i is set.
+        """
+
+        self._check_index(i)
+        return bitmanip.is_set(self._words[i >> 6], i & 63)
+
+    def set(self, i):
+        """
+        Set bit i.
+        """
+
+        self._check_index(i)
+        w = i >> 6
+        self._words[w] = bitmanip.set_bit(self._words[w], i & 63)
+
+    def unset(self, i):
+        """
+        Unset bit i.
+        """
+
+        self._check_index(i)
+        w = i >> 6
+        self._words[w] = bitmanip.unset_bit(self._words[w], i & 63)
+
+    def toggle(self, i):
+        """
+        Toggle bit i.
+        """
+
+        self._check_index(i)
+        w = i >> 6
+        self._words[w] = bitmanip.toggle_bit(self._words[w], i & 63)
+
+    __getitem__ = test
+
+    def __setitem__(self, i, value):
+        if (value):
+            self.set(i)
+        else:
+            self.unset(i)
+
+    def fill(self, start=0, stop=None, value=True):
+        """
+        Set (or unset if not value) bits [start, stop). stop defaults to
+        len(self).
+        """
+
+        if (stop is None):
+            stop = self._length
+        if (not (0 <= start <= stop <= self._length)):
+            raise IndexError("Bitset fill range out of range")
+        if (start == stop):
+            return
+
+        first_word, first_bit = start >> 6, start & 63
+        last_word, last_bit = (stop - 1) >> 6, (stop - 1) & 63
+        words = self._words
+
+        def fill_word(w, mask):
+            if (value):
+                words[w] |= mask
+            else:
+                words[w] &= ~mask & bitmanipvector.WORD_MASK
+
+        if (first_word == last_word):
+            fill_word(first_word,
+                      bitmanip.ones(last_bit - first_bit + 1, first_bit))
+            return
+
+        fill_word(first_word, bitmanip.ones(self.WORD_BITS - first_bit,
+                                            first_bit))
+        fill_word(last_word, bitmanip.ones(last_bit + 1))
+        full_word = bitmanipvector.WORD_MASK if value else 0
+        words[first_word + 1:last_word] = \
+            array('Q', [full_word]) * (last_word - first_word - 1)
+
+    def count(self):
+        """
+        Return the number of bits set.
+        """
+
+        return sum(bitmanip.popcount_many(self._words))
+
+    def iter_set_bits(self):
+        """
+        Yield the indices of the set bits in increasing order.
+        """
+
+        return _iter_set_bits(self._words)
+
+    def _combine(self, other, operator):
+        """
+        Replace the words with operator(self, other) done on every word.
+        """
+
+        if (not isinstance(other, Bitset)):
+            return NotImplemented
+        if (self._length != other._length):
+            raise ValueError("Bitsets must have the same length.")
+
+        x = operator(self.to_int(), other.to_int())
+        packed = x.to_bytes(len(self._words) * bitmanipvector.WORD_BYTES,
+                            sys.byteorder)
+        memoryview(self._words).cast('B')[:] = packed
+        return self
+
+    def __iand__(self, other):
+        return self._combine(other, lambda x, y: x & y)
+
+    def __ior__(self, other):
+        return self._combine(other, lambda x, y: x | y)
+
+    def __ixor__(self, other):
+        return self._combine(other, lambda x, y: x ^ y)
+
+    def __and__(self, other):
+        return self.copy().__iand__(other)
+
+    def __or__(self, other):
+        return self.copy().__ior__(other)
+
+    def __xor__(self, other):
+        return self.copy().__ixor__(other)
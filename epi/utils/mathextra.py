@@ -1,16 +1,58 @@
 from abc import abstractmethod, ABCMeta
 from collections import namedtuple
 from enum import Enum
+import array
+import bisect
+import collections.abc
+import concurrent.futures
 import fractions
+import functools
+import itertools
 import math
+import mmap
+import operator
+import os
+import struct
 
-from epi.utils import python
+from epi.utils import bitmanip, python
 
 def n_choose_r(n, r):
     """
     Return the number of combinations of n choose r.
 
-    Uses a for loop because factorials get big really quickly.
+    Uses n_choose_r_multiplicative() for small r, and
+    n_choose_r_prime_exponents() when r is big enough compared to n
+    that sieving up to n is cheaper than r big-int multiplications.
+    The sieve and the prime power products have a fixed cost, so below
+    a few hundred r the multiplicative version is faster for any n.
+    """
+
+    if ((n < 0) or (r < 0) or (r > n)):
+        return 0
+
+    r = min(r, n - r)
+    if ((r >= N_CHOOSE_R_PRIME_EXPONENTS_MIN_R) and
+        (r * r > N_CHOOSE_R_PRIME_EXPONENTS_RATIO * n)):
+        return n_choose_r_prime_exponents(n, r)
+    return n_choose_r_multiplicative(n, r)
+
+"""
+n_choose_r() switches to n_choose_r_prime_exponents() when
+min(r, n - r) >= N_CHOOSE_R_PRIME_EXPONENTS_MIN_R and
+min(r, n - r)**2 > N_CHOOSE_R_PRIME_EXPONENTS_RATIO * n. Measured, the
+two are about as fast at r ~= 320 for n ~= 1000 and at
+r ~= sqrt(48 * n) for n from a few thousand up.
+"""
+N_CHOOSE_R_PRIME_EXPONENTS_MIN_R = 320
+N_CHOOSE_R_PRIME_EXPONENTS_RATIO = 48
+
+def n_choose_r_fraction(n, r):
+    """
+    Return the number of combinations of n choose r.
+
+    Uses a for loop because factorials get big really quickly. Each
+    step multiplies by a fractions.Fraction, which normalizes with a
+    gcd every time, so this is the slowest version.
     """
 
     if ((n < 0) or (r < 0) or (r > n)):
@@ -21,6 +63,206 @@ def n_choose_r(n, r):
         answer *= fractions.Fraction(n - i, i + 1)
     return int(answer)
 
+def n_choose_r_multiplicative(n, r):
+    """
+    Return the number of combinations of n choose r using only integers.
+
+    After step i, answer == C(n - r + i, i), which is an integer, so
+    answer * (n - r + i) is always exactly divisible by i and no
+    fractions are needed. r is replaced by min(r, n - r) first since
+    C(n, r) == C(n, n - r).
+    """
+
+    if ((n < 0) or (r < 0) or (r > n)):
+        return 0
+
+    r = min(r, n - r)
+    answer = 1
+    for i in range(1, r + 1):
+        answer = (answer * (n - r + i)) // i
+    return answer
+
+def n_choose_r_prime_exponents(n, r):
+    """
+    Return the number of combinations of n choose r from its prime
+    factorization.
+
+    By Legendre's formula, the exponent of the prime p in m! is
+    sum(m // p**k for k >= 1), so the exponent of p in
+    C(n, r) == n! / (r! * (n - r)!) is
+    sum(n // p**k - r // p**k - (n - r) // p**k for k >= 1)
+    which is also the number of carries when adding r and n - r in
+    base p (Kummer's theorem). Only the primes <= sqrt(n) can have an
+    exponent > 1. With r <= n - r, every prime in (n - r, n] has an
+    exponent of exactly 1.
+
+    The primes come from generate_primes_segmented(), so only a segment
+    of the sieve is kept at a time and the shared prime_sieve only grows
+    to sqrt(n). The prime powers are multiplied with balanced_product(),
+    so the big multiplications are between numbers of similar size.
+    """
+
+    if ((n < 0) or (r < 0) or (r > n)):
+        return 0
+
+    r = min(r, n - r)
+    n_minus_r = n - r
+    sqrt_n = int_sqrt_python(n)
+    prime_powers = []
+    for prime_number in generate_primes_segmented(n):
+        if (prime_number > n_minus_r):
+            prime_powers.append(prime_number)
+        elif (prime_number > sqrt_n):
+            if (n // prime_number - r // prime_number -
+                n_minus_r // prime_number):
+                prime_powers.append(prime_number)
+        else:
+            exponent = 0
+            prime_power = prime_number
+            while (prime_power <= n):
+                exponent += n // prime_power - r // prime_power - \
+                            n_minus_r // prime_power
+                prime_power *= prime_number
+            if (exponent):
+                prime_powers.append(prime_number ** exponent)
+    return balanced_product(prime_powers)
+
+"""
+The most recent n_choose_r_cached() answers kept.
+"""
+N_CHOOSE_R_CACHE_SIZE = 1 << 16
+
+@functools.lru_cache(maxsize=N_CHOOSE_R_CACHE_SIZE)
+def n_choose_r_cached(n, r):
+    """
+    Return n_choose_r(n, r), memoized in a bounded LRU cache. Meant for
+    callers that ask for the same small binomials over and over.
+    """
+
+    return n_choose_r(n, r)
+
+class BinomialModTable:
+    """
+    Precomputed factorials mod a prime p that answer n choose r mod p in
+    O(1) time.
+
+    factorials[i] == i! % p and inverse_factorials[i] == (i!)**-1 % p,
+    so for n < p
+    C(n, r) == n! / (r! * (n - r)!) == factorials[n] *
+               inverse_factorials[r] * inverse_factorials[n - r] (mod p)
+    Both tables are array('q') so 10**7 entries take 80 MB each instead
+    of the ~350 MB a list of ints would.
+
+    Only one modular inverse is computed, for the largest factorial. The
+    rest come from walking back down with
+    (i!)**-1 == ((i + 1)!)**-1 * (i + 1) (mod p)
+
+    i! == 0 (mod p) for i >= p, so the tables stop at p - 1 and n >= p
+    goes through Lucas' theorem instead: write n and r in base p, then
+    C(n, r) == product(C(n_i, r_i)) (mod p) over the digits n_i, r_i.
+    """
+
+    def __init__(self, n_max, p):
+        """
+        Create the tables for n choose r mod p with n <= n_max. p must
+        be a prime < 2**63 so the table entries fit in array('q').
+        """
+
+        if ((p >= 1 << 63) or (not is_prime_miller_rabin(p))):
+            raise ValueError("p must be a prime < 2**63")
+        if (n_max < 0):
+            raise ValueError("n_max must be >= 0")
+
+        self.n_max = n_max
+        self.p = p
+
+        size = min(n_max, p - 1) + 1
+        factorials = array.array("q", bytes(8 * size))
+        factorial = 1
+        for i in range(size):
+            factorials[i] = factorial
+            factorial = (factorial * (i + 1)) % p
+
+        inverse_factorials = array.array("q", bytes(8 * size))
+        inverse_factorial = pow(factorials[-1], p - 2, p)
+        for i in range(size - 1, -1, -1):
+            inverse_factorials[i] = inverse_factorial
+            inverse_factorial = (inverse_factorial * i) % p
+
+        self.factorials = factorials
+        self.inverse_factorials = inverse_factorials
+
+    def n_choose_r(self, n, r):
+        """
+        Return n choose r mod p.
+        """
+
+        if ((r < 0) or (r > n)):
+            return 0
+        if ((n > self.n_max) and (len(self.factorials) < self.p)):
+            raise ValueError("n must be <= n_max")
+
+        if (n < self.p):
+            return self._n_choose_r_small(n, r)
+        return self._n_choose_r_lucas(n, r)
+
+    def n_choose_r_many(self, pairs):
+        """
+        Return an array('q') with n choose r mod p for each (n, r) in
+        pairs.
+        """
+
+        return array.array("q", (self.n_choose_r(n, r) for (n, r) in pairs))
+
+    def _n_choose_r_small(self, n, r):
+        """
+        Return n choose r mod p for 0 <= r <= n < p.
+        """
+
+        p = self.p
+        answer = (self.factorials[n] * self.inverse_factorials[r]) % p
+        return (answer * self.inverse_factorials[n - r]) % p
+
+    def _n_choose_r_lucas(self, n, r):
+        """
+        Return n choose r mod p using Lucas' theorem.
+        """
+
+        p = self.p
+        answer = 1
+        while (r):
+            n_digit = n % p
+            r_digit = r % p
+            if (r_digit > n_digit):
+                return 0
+            answer = (answer * self._n_choose_r_small(n_digit, r_digit)) % p
+            n //= p
+            r //= p
+        return answer
+
+def balanced_product(values):
+    """
+    Return the product of values, multiplying pairs of neighbours
+    until one number is left.
+
+    Multiplying left to right makes every step a big number times a
+    small number, which is O(n**2) overall. Pairing keeps the operands
+    about the same size, which lets Python's Karatsuba multiplication
+    help.
+    """
+
+    values = list(values)
+    if (not values):
+        return 1
+
+    while (len(values) > 1):
+        paired = [values[i] * values[i + 1]
+                  for i in range(0, len(values) - 1, 2)]
+        if (is_odd(len(values))):
+            paired.append(values[-1])
+        values = paired
+    return values[0]
+
 def is_even(x):
     """
     Return True if x is even.
@@ -35,6 +277,322 @@ def is_odd(x):
 
     return (x & 1) == 1
 
+def greatest_common_divisor(x, y):
+    """
+    Returns the greatest common divisor of x and y iteratively.
+
+    This works by using Euclid's algorithm as shown in the else case
+    and in the if case when (y == 0). The code keeps x > y.
+    There are some optimizations to Euclid's algorithm by checking
+    when x and y are even.
+    If both x and y are even, you can divide
+    them both by 2 (right shift 1) and multiply the final answer
+    by 2 (left shift 1).
+    If only one is even, you can divide that one by 2 because
+    2 is not a factor of the GCD since the other number isn't
+    divisible by 2. When x is the even one (and y is odd),
+    x gets divided by 2 so you have to check if x is still > y,
+    otherwise you swap them.
+    If they are both odd, follow with the Euclid's alogirthm,
+    which is "The GCD of two numbers does not change if the larger
+    number is replaced by its difference with the smaller number".
+    You have to check if x and y need to be swapped in this case
+    as well, to keep x > y.
+    """
+
+    if (x < y):
+        x, y = y, x
+
+    shift_multiplier = 0
+    while (True):
+        if (y == 0):
+            return x << shift_multiplier
+
+        x_is_even = is_even(x)
+        x_is_odd = not x_is_even
+        y_is_even = is_even(y)
+        y_is_odd = not y_is_even
+
+        if (x_is_even and y_is_even):
+            x >>= 1
+            y >>= 1
+            shift_multiplier += 1
+        elif (x_is_odd and y_is_even):
+            y >>= 1
+        elif (x_is_even and y_is_odd):
+            x >>= 1
+            if (x < y):
+                x, y = y, x
+        else:
+            x -= y
+            if (x < y):
+                x, y = y, x
+
+def greatest_common_divisor_binary(x, y):
+    """
+    Returns the greatest common divisor of x and y (both >= 0) using
+    Stein's binary GCD, removing all the trailing 0's at once.
+
+    greatest_common_divisor() strips one factor of 2 per iteration. But
+    the number of trailing 0's of x is just the index of its lowest set
+    bit, bitmanip.count_trailing_zeros(x), so they can all be shifted
+    out with a single shift:
+    1. The common factors of 2 are the trailing 0's of x | y. They are
+       counted once and shifted back in at the end.
+    2. After that, x is made odd, and y is made odd at the top of each
+       iteration, since 2 isn't a factor of the GCD anymore.
+    3. Both being odd, y - x is even, so the loop keeps x <= y and
+       replaces y with y - x (Euclid's subtraction), which the next
+       iteration makes odd again.
+
+    The inner loop inlines count_trailing_zeros() because a function
+    call costs more than the bit operations.
+    """
+
+    if (x == 0):
+        return y
+    if (y == 0):
+        return x
+
+    shift = bitmanip.count_trailing_zeros(x | y)
+    x >>= bitmanip.count_trailing_zeros(x)
+    while (y):
+        y >>= (y & -y).bit_length() - 1
+        if (x > y):
+            x, y = y, x
+        y -= x
+    return x << shift
+
+"""
+greatest_common_divisor_lehmer() works on the top LEHMER_GCD_WORD_BITS
+bits of x and y while y has more bits than this.
+"""
+LEHMER_GCD_WORD_BITS = 62
+
+def greatest_common_divisor_lehmer(x, y):
+    """
+    Returns the greatest common divisor of x and y (both >= 0) using
+    Lehmer's algorithm for multi-word numbers, and
+    greatest_common_divisor_binary() once they fit in a word.
+
+    Euclid's algorithm on big numbers spends most of its time on
+    quotients that only depend on the leading bits. Lehmer's algorithm
+    runs Euclid on just the leading word of x and y, x_hat and y_hat,
+    while tracking the cofactors A, B, C, D such that the current
+    single-word pair would be (A*x + B*y, C*x + D*y) on the full numbers.
+    A quotient is only trusted if it is the same for both
+    (x_hat + A) // (y_hat + C) and (x_hat + B) // (y_hat + D), which
+    bound the quotient the full numbers would give. When they disagree,
+    the cofactors are applied to x and y all at once, so many Euclid
+    steps cost two multi-word multiply-adds. If no step could be
+    trusted (B == 0), one full-size Euclid step is done instead.
+
+    This uses multiplication and division, so unlike the other GCDs
+    in P10_GreatestCommonDivisor it does not follow the problem's
+    constraints. It is here to show the speedup on huge numbers.
+    """
+
+    if (x < y):
+        x, y = y, x
+
+    word_bits = LEHMER_GCD_WORD_BITS
+    while (y.bit_length() > word_bits):
+        shift = x.bit_length() - word_bits
+        x_hat = x >> shift
+        y_hat = y >> shift
+
+        A, B, C, D = 1, 0, 0, 1
+        while ((y_hat + C != 0) and (y_hat + D != 0)):
+            q = (x_hat + A) // (y_hat + C)
+            if (q != (x_hat + B) // (y_hat + D)):
+                break
+            A, C = C, A - q*C
+            B, D = D, B - q*D
+            x_hat, y_hat = y_hat, x_hat - q*y_hat
+
+        if (B == 0):
+            x, y = y, x % y
+        else:
+            x, y = A*x + B*y, C*x + D*y
+
+    return greatest_common_divisor_binary(x, y)
+
+def gcd_many(values, gcd=greatest_common_divisor_binary):
+    """
+    Returns the greatest common divisor of all of values (all >= 0).
+    gcd(0, 0, ...) == 0.
+
+    The GCD only gets smaller, so this stops as soon as it reaches 1.
+    """
+
+    answer = 0
+    for x in values:
+        answer = gcd(answer, x)
+        if (answer == 1):
+            break
+    return answer
+
+def lcm_many(values, gcd=greatest_common_divisor_binary):
+    """
+    Returns the least common multiple of all of values (all >= 0).
+    If any value is 0, the answer is 0.
+
+    Uses lcm(a, b) == (a // gcd(a, b)) * b, dividing first so the
+    intermediate numbers are no bigger than the answer.
+    """
+
+    answer = 1
+    for x in values:
+        if (x == 0):
+            return 0
+        answer = (answer // gcd(answer, x)) * x
+    return answer
+
+def product_tree(values):
+    """
+    Return the product tree of values as a list of levels. tree[0] is
+    values, each number in tree[i + 1] is the product of a pair of
+    neighbours in tree[i] (an odd one out is carried up as is), and
+    tree[-1] == [product of all values].
+    """
+
+    tree = [list(values)]
+    while (len(tree[-1]) > 1):
+        level = tree[-1]
+        next_level = [level[i] * level[i + 1]
+                      for i in range(0, len(level) - 1, 2)]
+        if (is_odd(len(level))):
+            next_level.append(level[-1])
+        tree.append(next_level)
+    return tree
+
+def remainder_tree(x, tree, square=False):
+    """
+    Return [x % v for v in tree[0]] (or x % v**2 if square) using the
+    product tree of the values.
+
+    Going down the tree, each node takes its parent's remainder mod
+    itself. Since the node divides its parent, that is the same as x mod
+    the node, but the numbers being divided shrink by half every level
+    instead of x being divided by every leaf.
+    """
+
+    remainders = [x]
+    for level in reversed(tree):
+        remainders = [remainders[i >> 1] % (v * v if square else v)
+                      for (i, v) in enumerate(level)]
+    return remainders
+
+def gcd_each(x, values, gcd=greatest_common_divisor_binary):
+    """
+    Returns [gcd(x, v) for v in values] (all v > 0).
+
+    gcd(x, v) == gcd(x % v, v), and all the x % v come out of one
+    remainder_tree(), so a huge x is only divided in full once.
+    """
+
+    if (not values):
+        return []
+
+    remainders = remainder_tree(x, product_tree(values))
+    return [gcd(r, v) for (r, v) in zip(remainders, values)]
+
+def batch_gcd(values, gcd=greatest_common_divisor_binary):
+    """
+    Returns [gcd(v, product of the other values) for v in values] (all
+    v > 0) in quasi-linear time using Bernstein's batch GCD.
+
+    The answer is > 1 exactly for the values that share a factor with
+    some other value. Doing this pairwise is O(N**2) GCDs.
+
+    Let P be the product of all the values (the root of the
+    product_tree()). P // v is the product of the other values, and
+    gcd(v, P // v) == gcd((P % v**2) // v, v)
+    since P % v**2 == v * ((P // v) % v). All the P % v**2 come out of
+    one remainder_tree() with square=True.
+
+    The top levels of the trees divide numbers as big as P. CPython's
+    long division is quadratic below Python 3.12, so those levels
+    dominate the time, but it is still far faster than pairwise GCDs
+    (~15x for 20000 64-bit values).
+    """
+
+    if (not values):
+        return []
+
+    tree = product_tree(values)
+    remainders = remainder_tree(tree[-1][0], tree, square=True)
+    return [gcd(r // v, v) for (r, v) in zip(remainders, values)]
+
+def extended_gcd(x, y):
+    """
+    Returns (g, s, t) where g is the greatest common divisor of x and y
+    (both >= 0) and s * x + t * y == g (Bezout coefficients).
+
+    This is Euclid's algorithm with remainders, tracking how each
+    remainder is written in terms of x and y. Every new remainder is
+    r0 - q * r1, so its coefficients are (s0 - q * s1, t0 - q * t1).
+    """
+
+    s0, s1 = 1, 0
+    t0, t1 = 0, 1
+    while (y):
+        q, r = divmod(x, y)
+        x, y = y, r
+        s0, s1 = s1, s0 - q * s1
+        t0, t1 = t1, t0 - q * t1
+    return x, s0, t0
+
+def mod_inverse(a, m):
+    """
+    Returns the inverse of a mod m, the number b in [0, m) with
+    (a * b) % m == 1. Raises ValueError if a isn't invertible
+    (gcd(a, m) != 1).
+
+    If s * a + t * m == 1 then s * a == 1 (mod m), so the inverse is the
+    Bezout coefficient of a.
+    """
+
+    g, s, _ = extended_gcd(a % m, m)
+    if (g != 1):
+        raise ValueError("{} is not invertible mod {}".format(a, m))
+    return s % m
+
+def batch_mod_inverse(values, m):
+    """
+    Returns [mod_inverse(v, m) for v in values] using Montgomery's
+    trick: a single mod_inverse() and 3 * (n - 1) multiplications.
+
+    Let prefix[i] be the product of values[:i + 1] mod m. Invert the
+    whole product, prefix[-1], once. Then walking backwards,
+    inverse(values[i]) == inverse(prefix[i]) * prefix[i - 1]
+    inverse(prefix[i - 1]) == inverse(prefix[i]) * values[i]
+    Raises ValueError if any value isn't invertible, since then the
+    whole product isn't either.
+    """
+
+    values = list(values)
+    if (not values):
+        return []
+
+    prefix = [0] * len(values)
+    product = 1
+    for (i, v) in enumerate(values):
+        product = (product * v) % m
+        prefix[i] = product
+
+    try:
+        inverse = mod_inverse(product, m)
+    except ValueError:
+        raise ValueError("not all values are invertible mod {}".format(m))
+
+    answer = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        answer[i] = (inverse * prefix[i - 1]) % m
+        inverse = (inverse * values[i]) % m
+    answer[0] = inverse
+    return answer
+
 def generate_primes(n):
     """
     Return a generator of prime numbers from [1, n].
@@ -177,9 +735,11 @@ def is_prime_sieve(x):
     """
     Return True if x is prime.
 
-    This generates a sieve and iterates through all the primes generated
-    by the sieve to check if they are factors of x. It is slower than
-    the is_prime() function.
+    This iterates through all the primes up to sqrt(x) given by the
+    module-level prime_sieve to check if they are factors of x. The
+    sieve is only extended past the largest sqrt(x) seen so far, so
+    repeated calls don't re-sieve from scratch. It is still slower than
+    the is_prime() function for a single x.
     """
 
     if (x <= 1):
@@ -190,8 +750,8 @@ def is_prime_sieve(x):
     if ((x_mod_6 != 1) and (x_mod_6 != 5)):
         return False
 
-    sqrt_x = int_sqrt(x)
-    for i in generate_primes(sqrt_x):
+    sqrt_x = int_sqrt_python(x)
+    for i in generate_primes_cached(sqrt_x):
         if ((x % i) == 0):
             return False
     return True
@@ -200,7 +760,7 @@ def int_sqrt(x):
     """
     Return the integer square root of x using Newton's method.
 
-    This function starts with a guess of x and keeps updating
+    This function starts with a guess >= sqrt(x) and keeps updating
     the guess as long as it lowers. When it increases, it returns
     the previous guess.
 
@@ -218,20 +778,800 @@ def int_sqrt(x):
     g1 = g0 + (x - g0**2)//(2*g0)
     g1 = g0 + (x//g0 - g0)//2
     g1 = (g0 + x//g0) // 2
+
+    The first guess is 1 << ceil(bit_length / 2). Since
+    x < 2**bit_length, this is >= sqrt(x) and < 2 * sqrt(x), so Newton's
+    method converges quadratically from the first update. Starting
+    from a guess of x instead would halve the guess log2(x) / 2 times
+    before getting anywhere near sqrt(x).
     """
 
     if (x < 0):
         raise ValueError("math domain error")
+    elif (x == 0):
+        return 0
 
     update = lambda guess: (guess + x//guess) // 2
 
-    guess = x
+    guess = 1 << ((x.bit_length() + 1) // 2)
     next_guess = update(guess)
     while (next_guess < guess):
         guess = next_guess
         next_guess = update(guess)
     return guess
 
+"""
+int_sqrt_karatsuba() uses int_sqrt() below this many bits.
+"""
+KARATSUBA_SQRT_THRESHOLD = 1 << 10
+
+def int_sqrt_remainder(x):
+    """
+    Return (s, r) where s is the integer square root of x and
+    r == x - s**2, using Zimmermann's Karatsuba square root.
+
+    Split x into four k-bit limbs, x == a3*B**3 + a2*B**2 + a1*B + a0
+    where B == 2**k. Recursively take (s1, r1) of the top half
+    a3*B + a2. Then
+    q, u = divmod(r1*B + a1, 2*s1)
+    s = s1*B + q
+    r = u*B + a0 - q**2
+    is the answer, except that s can be 1 too big, which shows up as
+    r < 0 and is fixed with r += 2*s - 1, s -= 1. The single correction
+    needs a3 >= B/4, so x is first shifted left by an even amount 2*t
+    to fill the top limb, and the answer is shifted back by t.
+
+    Each level does one half-size division instead of a full-size
+    Newton iteration, so huge inputs need a lot less work.
+    """
+
+    if (x < 0):
+        raise ValueError("math domain error")
+
+    bit_length = x.bit_length()
+    if (bit_length <= KARATSUBA_SQRT_THRESHOLD):
+        s = int_sqrt(x)
+        return s, x - s*s
+
+    k = (bit_length + 3) // 4
+    normalize_shift = (4*k - bit_length) // 2
+    if (normalize_shift):
+        s, _ = int_sqrt_remainder(x << (2 * normalize_shift))
+        s >>= normalize_shift
+        return s, x - s*s
+
+    mask = (1 << k) - 1
+    a0 = x & mask
+    a1 = (x >> k) & mask
+    s1, r1 = int_sqrt_remainder(x >> (2 * k))
+
+    q, u = divmod((r1 << k) + a1, s1 << 1)
+    s = (s1 << k) + q
+    r = (u << k) + a0 - q*q
+    if (r < 0):
+        r += (s << 1) - 1
+        s -= 1
+    return s, r
+
+def int_sqrt_karatsuba(x):
+    """
+    Return the integer square root of x using int_sqrt_remainder().
+    """
+
+    return int_sqrt_remainder(x)[0]
+
+"""
+Return the integer square root of x using Python's math.isqrt(). This
+is bound directly so there is no extra Python call per square root.
+"""
+int_sqrt_python = math.isqrt
+
+def int_cbrt(x):
+    """
+    Return the integer cube root of x (x >= 0) using Newton's method.
+
+    This is int_sqrt() for f(g) = g**3 - x, which gives
+    g1 = (2*g0 + x//(g0**2)) // 3
+    The first guess is 1 << ceil(bit_length / 3), which is always >= the
+    cube root, so the guesses decrease until they stop decreasing.
+    """
+
+    if (x < 0):
+        raise ValueError("math domain error")
+    elif (x == 0):
+        return 0
+
+    update = lambda guess: (2 * guess + x // (guess * guess)) // 3
+
+    guess = 1 << -(-x.bit_length() // 3)
+    next_guess = update(guess)
+    while (next_guess < guess):
+        guess = next_guess
+        next_guess = update(guess)
+    return guess
+
+"""
+PrimeSieve.primes() unpacks a memory-mapped sieve this many bytes at a
+time.
+"""
+PRIMES_UNPACK_BYTES = 1 << 16
+
+class PrimeSieve:
+    """
+    A Sieve of Eratosthenes that is kept around between calls and only
+    grows on demand.
+
+    The sieve uses the same odd-only mapping as generate_primes():
+    number = (2 * index) + 3
+    index = (number - 3) // 2
+    so _flags[i] == 1 iff (2 * i) + 3 is prime. _flags is a bytearray
+    because marking a whole stride of composites is a single slice
+    assignment, which runs in C instead of a Python for loop.
+
+    extend(n) only sieves the segment (limit, n] that hasn't been sieved
+    yet. The primes needed to sieve the segment are the ones <= sqrt(n),
+    which are already in the sieve (or get found while sieving the front
+    of the segment) since sqrt(n) <= n.
+
+    The sieve can be saved to a file with save() and loaded with load().
+    The file is a small header followed by the flags bit-packed 8 to a
+    byte (bit i of the file is _flags[i]), so primes up to 10**8 take
+    ~6 MB. load() memory-maps the file instead of reading it, so many
+    short-lived processes can share the same pages and query primes with
+    no recomputation. A loaded sieve is only unpacked to _flags if it has
+    to be extended past the saved limit.
+    """
+
+    _FILE_MAGIC = b"EPIPRIME"
+    _FILE_HEADER = struct.Struct("<8sQ")
+
+    # translate tables between 0/1 flag bytes and ASCII "0"/"1" digits
+    _FLAGS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+    _DIGITS_TO_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+    def __init__(self, n=2):
+        """
+        Create a sieve that covers [1, n].
+        """
+
+        self._limit = 2
+        self._flags = bytearray()
+        self._packed = None
+        self._mmap = None
+        self.extend(n)
+
+    @property
+    def limit(self):
+        """
+        Return the largest number covered by the sieve.
+        """
+
+        return self._limit
+
+    @staticmethod
+    def _number_to_index(number):
+        return (number - 3) // 2
+
+    @staticmethod
+    def _index_to_number(index):
+        return (2 * index) + 3
+
+    def extend(self, n):
+        """
+        Extend the sieve to cover [1, n]. Does nothing if n is already
+        covered.
+
+        Each prime p <= sqrt(n) marks its odd multiples in the new segment
+        starting from the first odd multiple of p that is >= both p * p
+        and the start of the segment. The index step is p because the
+        number step is 2 * p.
+        """
+
+        if (n <= self._limit):
+            return
+
+        self._unpack()
+
+        flags = self._flags
+        segment_start_number = self._limit + 1
+        segment_start_index = len(flags)
+        new_length = len(range(3, n + 1, 2))
+        flags.extend(b"\x01" * (new_length - segment_start_index))
+
+        sqrt_n = int_sqrt_python(n)
+        for i in range(len(range(3, sqrt_n + 1, 2))):
+            if (flags[i]):
+                prime_number = self._index_to_number(i)
+
+                start_number = -(-segment_start_number // prime_number) * \
+                               prime_number
+                start_number = max(start_number, prime_number * prime_number)
+                if (is_even(start_number)):
+                    start_number += prime_number
+
+                start_index = self._number_to_index(start_number)
+                if (start_index < new_length):
+                    flags[start_index::prime_number] = \
+                        bytes(len(range(start_index, new_length, prime_number)))
+
+        self._limit = n
+
+    def is_prime(self, x):
+        """
+        Return True if x is prime. Extends the sieve if x is not covered.
+        """
+
+        if (x <= 2):
+            return x == 2
+        elif (is_even(x)):
+            return False
+
+        self.extend(x)
+        index = self._number_to_index(x)
+        if (self._packed is not None):
+            return ((self._packed[index >> 3] >> (index & 7)) & 1) == 1
+        return self._flags[index] == 1
+
+    def primes(self, n, start=1):
+        """
+        Return a generator of prime numbers from [start, n]. Extends the
+        sieve if n is not covered.
+        """
+
+        self.extend(n)
+
+        if (start <= 2 <= n):
+            yield 2
+
+        start_index = max(self._number_to_index(max(start, 3) + 1), 0)
+        end_index = len(range(3, n + 1, 2))
+        if (self._packed is None):
+            numbers = range(self._index_to_number(start_index), n + 1, 2)
+            yield from itertools.compress(
+                numbers, self._flags[start_index:end_index])
+        elif (start_index < end_index):
+            # Copy the bytes covering [start_index, end_index) so extending
+            # the sieve, which releases the mapping, can't break this
+            # generator. They are unpacked PRIMES_UNPACK_BYTES at a time.
+            first_byte = start_index >> 3
+            packed = memoryview(bytes(
+                self._packed[first_byte:(end_index + 7) >> 3]))
+            for block_start in range(0, len(packed), PRIMES_UNPACK_BYTES):
+                block = packed[block_start:block_start + PRIMES_UNPACK_BYTES]
+                block_index = (first_byte + block_start) << 3
+                flags = self._unpack_flags(block, len(block) << 3)
+                low = max(start_index - block_index, 0)
+                high = min(end_index - block_index, len(flags))
+                numbers = range(self._index_to_number(block_index + low),
+                                self._index_to_number(block_index + high), 2)
+                yield from itertools.compress(numbers, flags[low:high])
+
+    def save(self, path):
+        """
+        Save the sieve to path as a header followed by the bit-packed
+        flags.
+
+        Packing goes through a string of binary digits because int() and
+        int.to_bytes() do the bit shuffling in C. The digits are reversed
+        so _flags[0] ends up as the least significant bit.
+        """
+
+        length = len(range(3, self._limit + 1, 2))
+        if (self._packed is not None):
+            packed = bytes(self._packed[:(length + 7) // 8])
+        elif (length):
+            digits = self._flags.translate(self._FLAGS_TO_DIGITS)[::-1]
+            packed = int(digits, 2).to_bytes((length + 7) // 8, "little")
+        else:
+            packed = b""
+
+        with open(path, "wb") as f:
+            f.write(self._FILE_HEADER.pack(self._FILE_MAGIC, self._limit))
+            f.write(packed)
+
+    def load(self, path):
+        """
+        Replace the sieve with the one saved at path. The file is
+        memory-mapped read-only and queried in its bit-packed form.
+        """
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, limit = self._FILE_HEADER.unpack_from(mapped)
+        if (magic != self._FILE_MAGIC):
+            mapped.close()
+            raise ValueError("{!r} is not a PrimeSieve file".format(path))
+
+        self._release()
+        self._limit = limit
+        self._flags = bytearray()
+        self._mmap = mapped
+        self._packed = memoryview(mapped)[self._FILE_HEADER.size:]
+
+    def _unpack(self):
+        """
+        Convert a memory-mapped sieve back to _flags so it can be extended.
+        """
+
+        if (self._packed is None):
+            return
+
+        length = len(range(3, self._limit + 1, 2))
+        self._flags = bytearray(self._unpack_flags(self._packed, length))
+        self._release()
+
+    @classmethod
+    def _unpack_flags(cls, packed, length):
+        """
+        Return the first length bits of packed as 0/1 flag bytes, bit i
+        of packed as byte i.
+
+        This goes through a string of binary digits like save(), so the
+        bit shuffling is done in C by int.from_bytes() and format().
+        """
+
+        bits = int.from_bytes(packed, "little")
+        digits = format(bits, "0{}b".format(length))[::-1][:length]
+        return digits.encode("ascii").translate(cls._DIGITS_TO_FLAGS)
+
+    def _release(self):
+        """
+        Release the memory-mapped file, if any.
+        """
+
+        if (self._packed is not None):
+            self._packed.release()
+            self._mmap.close()
+        self._packed = None
+        self._mmap = None
+
+"""
+The module-level sieve shared by every call in this process. Load a saved
+sieve into it with prime_sieve.load(path) to skip sieving at startup.
+"""
+prime_sieve = PrimeSieve()
+
+def generate_primes_cached(n):
+    """
+    Return a generator of prime numbers from [1, n] using the module-level
+    prime_sieve. Only the part of [1, n] that hasn't been sieved by an
+    earlier call is sieved.
+    """
+
+    return prime_sieve.primes(n)
+
+"""
+Bases that make is_prime_miller_rabin() deterministic for
+x < 3317044064679887385961981.
+"""
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+def is_prime_miller_rabin(x, bases=_MILLER_RABIN_BASES):
+    """
+    Return True if x is prime using the Miller-Rabin test.
+
+    Write x - 1 == d * 2**s with d odd. For a prime x, Fermat's little
+    theorem gives a**(x - 1) == 1 (mod x), and the only square roots of
+    1 mod a prime are 1 and -1. So going up the chain
+    a**d, a**(2d), a**(4d), ..., a**(x - 1)
+    either a**d == 1 or one of the terms is -1. If neither happens, a is
+    a witness that x is composite.
+
+    With the default bases the answer is exact for
+    x < 3317044064679887385961981 (> 2**81). For larger x, a composite
+    slips through with probability < 4**-len(bases).
+    """
+
+    if (x < 2):
+        return False
+    for base in bases:
+        if (x % base == 0):
+            return x == base
+
+    d = x - 1
+    s = 0
+    while (is_even(d)):
+        d >>= 1
+        s += 1
+
+    for base in bases:
+        y = pow(base, d, x)
+        if ((y == 1) or (y == x - 1)):
+            continue
+        for _ in range(s - 1):
+            y = (y * y) % x
+            if (y == x - 1):
+                break
+        else:
+            return False
+    return True
+
+"""
+The small-prime table used by is_prime_many() to throw out most
+composites before Miller-Rabin. The primes are multiplied together so a
+single gcd() (which runs in C) checks all of them.
+"""
+_SMALL_PRIMES_LIMIT = 1000
+_SMALL_PRIMES = frozenset(generate_primes(_SMALL_PRIMES_LIMIT))
+_SMALL_PRIMES_PRODUCT = math.prod(_SMALL_PRIMES)
+
+def _is_prime_many_chunk(values):
+    """
+    Return a bytearray with answer[i] == 1 iff values[i] is prime.
+
+    Values covered by prime_sieve are looked up in the sieve. The rest
+    are checked against the small-prime table and then Miller-Rabin.
+    """
+
+    answer = bytearray(len(values))
+    sieve_limit = prime_sieve.limit
+    sieve_is_prime = prime_sieve.is_prime
+    for (i, x) in enumerate(values):
+        if (x <= sieve_limit):
+            answer[i] = sieve_is_prime(x)
+        elif (x <= _SMALL_PRIMES_LIMIT):
+            answer[i] = x in _SMALL_PRIMES
+        elif (math.gcd(x, _SMALL_PRIMES_PRODUCT) == 1):
+            answer[i] = is_prime_miller_rabin(x)
+    return answer
+
+def is_prime_many(values, processes=None, parallel_threshold=1 << 17):
+    """
+    Return a bytearray with answer[i] == 1 iff values[i] is prime.
+    values can be any iterable of integers, such as a list or an
+    array.array.
+
+    Batches with at least parallel_threshold values are split into one
+    chunk per process and checked in a process pool with processes
+    workers (os.cpu_count() if None). Workers look up the prime_sieve
+    they inherit (or load), so sieve or load it before calling this.
+    """
+
+    if (not isinstance(values, collections.abc.Sequence)):
+        values = list(values)
+
+    if (processes is None):
+        processes = os.cpu_count() or 1
+
+    if ((processes <= 1) or (len(values) < parallel_threshold)):
+        return _is_prime_many_chunk(values)
+
+    chunk_size = -(-len(values) // processes)
+    chunks = [values[i:i + chunk_size]
+              for i in range(0, len(values), chunk_size)]
+    answer = bytearray()
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        for chunk_answer in executor.map(_is_prime_many_chunk, chunks):
+            answer += chunk_answer
+    return answer
+
+"""
+phi(x, a) tables for prime_count(). _phi_tables[a] holds the counts of
+numbers in [0, Q) that aren't divisible by any of the first a primes,
+where Q is the product of the first a primes. phi(x, a) repeats every Q
+numbers, so phi(x, a) == (x // Q) * table[-1] + table[x % Q].
+"""
+_PHI_TABLE_PRIMES = (2, 3, 5, 7, 11, 13)
+_phi_tables = []
+
+def _fill_phi_tables():
+    """
+    Precompute _phi_tables for a in [0, len(_PHI_TABLE_PRIMES)].
+    """
+
+    del _phi_tables[:]
+    _phi_tables.append([0])
+    product = 1
+    for a in range(1, len(_PHI_TABLE_PRIMES) + 1):
+        product *= _PHI_TABLE_PRIMES[a - 1]
+        table = [0] * product
+        count = 0
+        for r in range(1, product):
+            if (all(r % p for p in _PHI_TABLE_PRIMES[:a])):
+                count += 1
+            table[r] = count
+        _phi_tables.append(table)
+
+"""
+prime_count() narrows each binary search in its primes to the primes
+in one block of 2**PRIME_COUNT_BLOCK_BITS numbers.
+"""
+PRIME_COUNT_BLOCK_BITS = 8
+
+def prime_count(n):
+    """
+    Return the number of primes <= n, pi(n), without listing the primes
+    above n**(2/3).
+
+    This uses Meissel's formula. Let p_i be the i-th prime and
+    a = pi(n**(1/3)), b = pi(n**(1/2)). Then
+    pi(n) == phi(n, a) + a - 1 - sum(pi(n // p_i) - (i - 1) for a < i <= b)
+    where the sum counts the numbers p_i * p_j <= n with a < i <= j, which
+    are the only numbers phi(n, a) counts besides 1 and the primes.
+    n // p_i < n**(2/3), so pi() is only needed up to n**(2/3).
+    phi(x, a) is the count of numbers in [1, x] not divisible by any of
+    the first a primes. It follows the recurrence
+    phi(x, a) == phi(x, a - 1) - phi(x // p_a, a - 1)
+    which is unrolled into a loop over the primes and cut short in three
+    places:
+    1. a <= 6 is looked up in the periodic _phi_tables.
+    2. x // p_i < p_i leaves only 1 for p_i and every larger prime.
+    3. x < p_(a+1)**3 leaves only 1, the primes in (p_a, x] and the
+       products of two of them, which is the same count as above:
+       phi(x, a) == pi(x) - a + 1 + sum(pi(x // p_i) - (i - 1) for
+                                         a < i, p_i**2 <= x)
+
+    pi(x) is a binary search in the primes up to n**(2/3), narrowed to a
+    single block by a table of pi() at every block boundary. The primes
+    are sieved a segment at a time into an array('I') that is freed with
+    the call, instead of growing the shared prime_sieve to n**(2/3).
+    Nothing is memoized, so memory is the primes and the table, about
+    4 * pi(n**(2/3)) bytes (23 MB for n == 10**12).
+    """
+
+    if (n < 2):
+        return 0
+
+    if (not _phi_tables):
+        _fill_phi_tables()
+
+    # n // p for the first prime p > n**(1/3) is the largest pi() argument.
+    cbrt_n = int_cbrt(n)
+    small_limit = max(n // (cbrt_n + 1), int_sqrt_python(n), 100)
+    typecode = "I" if (small_limit < (1 << 32)) else "q"
+    primes = array.array(typecode, generate_primes_segmented(small_limit))
+    block_bits = PRIME_COUNT_BLOCK_BITS
+    blocks = array.array(typecode, map(
+        bisect.bisect_left, itertools.repeat(primes),
+        range(0, small_limit + (2 << block_bits), 1 << block_bits)))
+    bisect_right = bisect.bisect_right
+    table_a = len(_phi_tables) - 1
+    table = _phi_tables[table_a]
+
+    def pi(x):
+        block = x >> block_bits
+        return bisect_right(primes, x, blocks[block], blocks[block + 1])
+
+    def phi(x, a):
+        if (a <= table_a):
+            if (a == 0):
+                return x
+            a_table = _phi_tables[a]
+            return (x // len(a_table)) * a_table[-1] + \
+                   a_table[x % len(a_table)]
+
+        p = primes[a]
+        if ((x <= small_limit) and (x < p * p * p)):
+            answer = pi(x) - a + 1
+            i = a
+            while (p * p <= x):
+                answer += pi(x // p) - i
+                i += 1
+                p = primes[i]
+            return answer
+
+        answer = (x // len(table)) * table[-1] + table[x % len(table)]
+        for i in range(table_a, a):
+            p = primes[i]
+            y = x // p
+            if (y < p):
+                # phi(x // p_j, j - 1) == 1 for every p_j <= x left
+                answer -= (a if (primes[a - 1] <= x) else pi(x)) - i
+                break
+            answer -= phi(y, i)
+        return answer
+
+    a = pi(cbrt_n)
+    b = pi(int_sqrt_python(n))
+    answer = phi(n, a) + a - 1
+    for i in range(a, b):
+        answer -= pi(n // primes[i]) - i
+    return answer
+
+def sieve_segment(low, high):
+    """
+    Return a bytearray with flags[i] == 1 iff low + i is prime, for the
+    segment [low, high).
+
+    Only the primes <= sqrt(high) are needed to sieve the segment, so
+    they come from the shared prime_sieve and the memory used is
+    O(high - low + sqrt(high)) regardless of how big low is.
+    """
+
+    low = max(low, 0)
+    if (high <= low):
+        return bytearray()
+
+    flags = bytearray(b"\x01") * (high - low)
+    for i in range(max(min(2, high) - low, 0)):
+        flags[i] = 0
+
+    for prime_number in prime_sieve.primes(int_sqrt_python(high - 1)):
+        start = max(prime_number * prime_number,
+                    -(-low // prime_number) * prime_number)
+        if (start < high):
+            flags[start - low::prime_number] = \
+                bytes(len(range(start - low, high - low, prime_number)))
+    return flags
+
+"""
+generate_primes_segmented() sieves this many numbers at a time.
+"""
+SIEVE_SEGMENT_SIZE = 1 << 20
+
+def generate_primes_segmented(n, start=1):
+    """
+    Return a generator of prime numbers from [start, n], sieved
+    SIEVE_SEGMENT_SIZE numbers at a time with sieve_segment().
+
+    Unlike generate_primes_cached(), the shared prime_sieve only grows to
+    sqrt(n), so the memory used is O(SIEVE_SEGMENT_SIZE + sqrt(n)) and is
+    freed as the generator goes.
+    """
+
+    for low in range(max(start, 0), n + 1, SIEVE_SEGMENT_SIZE):
+        high = min(low + SIEVE_SEGMENT_SIZE, n + 1)
+        yield from itertools.compress(range(low, high),
+                                      sieve_segment(low, high))
+
+def nth_prime(k):
+    """
+    Return the k-th prime (nth_prime(1) == 2).
+
+    This jumps close to the answer with Cipolla's estimate
+    p_k ~ k * (ln(k) + ln(ln(k)) - 1 + (ln(ln(k)) - 2) / ln(k))
+    counts the primes up to the estimate with prime_count(), then walks
+    the rest of the way with sieve_segment(), forwards if the estimate is
+    too small and backwards if it is too big. The estimate is off by a
+    tiny fraction of p_k, so only a few segments are sieved.
+    """
+
+    if (k < 1):
+        raise ValueError("k must be >= 1")
+
+    SMALL_PRIMES = (2, 3, 5, 7, 11, 13)
+    if (k <= len(SMALL_PRIMES)):
+        return SMALL_PRIMES[k - 1]
+
+    log_k = math.log(k)
+    log_log_k = math.log(log_k)
+    estimate = int(k * (log_k + log_log_k - 1 + (log_log_k - 2) / log_k))
+    count = prime_count(estimate)
+    segment_size = max(int_sqrt_python(estimate), 1 << 16)
+
+    if (count < k):
+        low = estimate + 1
+        while (True):
+            flags = sieve_segment(low, low + segment_size)
+            for prime_number in itertools.compress(
+                    range(low, low + segment_size), flags):
+                count += 1
+                if (count == k):
+                    return prime_number
+            low += segment_size
+    else:
+        high = estimate + 1
+        while (True):
+            low = max(high - segment_size, 0)
+            flags = sieve_segment(low, high)
+            for prime_number in itertools.compress(
+                    reversed(range(low, high)), reversed(flags)):
+                if (count == k):
+                    return prime_number
+                count -= 1
+            high = low
+
+"""
+A prime factor and how many times it divides a number.
+"""
+Factor = namedtuple("Factor", ["prime", "exponent"])
+
+"""
+factorize() trial divides by the primes up to this limit before falling
+back to Pollard-Brent rho.
+"""
+_TRIAL_DIVISION_LIMIT = 1 << 10
+
+def pollard_brent(n, c=1):
+    """
+    Return a nontrivial factor of the composite number n using Brent's
+    variant of Pollard's rho algorithm.
+
+    Pollard's rho iterates y = f(y) = y**2 + c (mod n). Mod an unknown
+    prime factor p of n, the sequence cycles after ~sqrt(p) steps, which
+    shows up as gcd(|x - y|, n) > 1 for two terms x and y in the same
+    place of the cycle.
+
+    Brent's variant finds the cycle by saving x every power of two steps
+    instead of running a second, doubled-speed sequence like Floyd's. It
+    also multiplies m differences together (mod n) and takes a single
+    gcd for all of them, with math.gcd() since the operands are as big
+    as n. If that gcd overshoots to n, the last batch is replayed one
+    gcd at a time. If even that gives n, the sequence cycled mod every
+    factor at once, so a new c is tried.
+    """
+
+    if (is_even(n)):
+        return 2
+
+    BATCH_SIZE = 128
+    while (True):
+        f = lambda y: (y * y + c) % n
+
+        y = 2
+        r = 1
+        q = 1
+        factor = 1
+        while (factor == 1):
+            x = y
+            for _ in range(r):
+                y = f(y)
+
+            k = 0
+            while ((k < r) and (factor == 1)):
+                saved_y = y
+                for _ in range(min(BATCH_SIZE, r - k)):
+                    y = f(y)
+                    q = (q * abs(x - y)) % n
+                factor = math.gcd(q, n)
+                k += BATCH_SIZE
+            r <<= 1
+
+        if (factor == n):
+            factor = 1
+            while (factor == 1):
+                saved_y = f(saved_y)
+                factor = math.gcd(abs(x - saved_y), n)
+
+        if (factor != n):
+            return factor
+        c += 1
+
+@functools.lru_cache(maxsize=1 << 16)
+def factorize(n):
+    """
+    Return the prime factorization of n (n >= 1) as a tuple of Factors
+    sorted by prime. factorize(1) == ().
+
+    Small factors are found by trial division with the primes up to
+    _TRIAL_DIVISION_LIMIT from the shared prime_sieve. If what is left
+    is > 1, each piece is split with pollard_brent() until
+    is_prime_miller_rabin() certifies it is prime. The answers are
+    memoized in an LRU cache, so repeated numbers are free.
+    """
+
+    if (n < 1):
+        raise ValueError("n must be >= 1")
+
+    exponents = {}
+    for prime_number in generate_primes_cached(_TRIAL_DIVISION_LIMIT):
+        if (prime_number * prime_number > n):
+            break
+        while (n % prime_number == 0):
+            exponents[prime_number] = exponents.get(prime_number, 0) + 1
+            n //= prime_number
+
+    stack = [n] if (n > 1) else []
+    while (stack):
+        m = stack.pop()
+        if (is_prime_miller_rabin(m)):
+            exponents[m] = exponents.get(m, 0) + 1
+        else:
+            factor = pollard_brent(m)
+            stack.append(factor)
+            stack.append(m // factor)
+
+    return tuple(Factor(p, exponents[p]) for p in sorted(exponents))
+
+def factorize_many(values):
+    """
+    Return a list with the factorize() answer for each of values.
+    Duplicates are factored once thanks to factorize()'s LRU cache.
+    """
+
+    return [factorize(x) for x in values]
+
 class AbstractPoint(metaclass=ABCMeta):
     """
     A 2-dimensional point on the Cartesian coordinates. This class also
@@ -243,6 +1583,10 @@ class AbstractPoint(metaclass=ABCMeta):
     method but promise to treat the class as immutable if using hash.
     """
 
+    # Empty so subclasses can use __slots__ (see AbstractSlotsPoint).
+    # Subclasses that don't define __slots__ still get a __dict__.
+    __slots__ = ()
+
     @abstractmethod
     def __setattr__(self, name, value):
         """
@@ -748,6 +2092,354 @@ class MutableColoredPoint(AbstractColoredPoint, MutablePoint):
 
     pass
 
+class AbstractSlotsPoint(AbstractPoint):
+    """
+    An AbstractPoint that stores x and y in __slots__ instead of a
+    __dict__, so each point is ~3x smaller, with faster arithmetic.
+
+    AbstractPoint's arithmetic goes through shallow_copy(), which checks
+    its arguments against python.Parameter.OTHER_ARGUMENT, then through
+    __init__(), which sets each attribute with object.__setattr__().
+    Here, the arithmetic calls the class directly, and __init__() sets
+    the slots with the slot descriptors' __set__(), which skips
+    __setattr__() (so it works for the frozen subclass too) without the
+    name lookup of object.__setattr__(). __mul__() and friends check for
+    int and float first, before the hasattr() checks for a point.
+
+    AbstractPoint has empty __slots__ so it doesn't give this class a
+    __dict__. Like AbstractPoint, this is abstract since it doesn't
+    override __setattr__() and __delattr__(). Subclasses that add
+    attributes have to add them to __slots__ and override shallow_copy().
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        """
+        Set x and y with the slot descriptors.
+        """
+
+        _set_slots_x(self, x)
+        _set_slots_y(self, y)
+
+    def __add__(self, other):
+        return self.__class__(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return self.__class__(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, other):
+        if (isinstance(other, (int, float))):
+            return self.__class__(self.x * other, self.y * other)
+        return AbstractPoint.__mul__(self, other)
+
+    def __truediv__(self, other):
+        if (isinstance(other, (int, float))):
+            return self.__class__(self.x / other, self.y / other)
+        return AbstractPoint.__truediv__(self, other)
+
+    def __floordiv__(self, other):
+        if (isinstance(other, (int, float))):
+            return self.__class__(self.x // other, self.y // other)
+        return AbstractPoint.__floordiv__(self, other)
+
+    def __abs__(self):
+        return self.__class__(abs(self.x), abs(self.y))
+
+    def __neg__(self):
+        return self.__class__(-self.x, -self.y)
+
+    def __pos__(self):
+        return self.__class__(self.x, self.y)
+
+    def norm(self):
+        """
+        Return the norm (magnitude) of self as if it was a vector.
+
+        math.hypot() is one C call and doesn't overflow for huge x or y.
+        """
+
+        return math.hypot(self.x, self.y)
+
+_set_slots_x = AbstractSlotsPoint.x.__set__
+_set_slots_y = AbstractSlotsPoint.y.__set__
+
+class FrozenSlotsPoint(AbstractSlotsPoint):
+    """
+    A FrozenPoint with __slots__. It is immutable, hashable and caches
+    its region like FrozenPoint.
+    """
+
+    __slots__ = ("_region",)
+
+    __setattr__ = FrozenPoint.__setattr__
+    __delattr__ = FrozenPoint.__delattr__
+    __hash__ = FrozenPoint.__hash__
+
+    def __init__(self, x, y):
+        """
+        Initialize x, y, and _region to use as a cache for the region.
+        """
+
+        _set_slots_x(self, x)
+        _set_slots_y(self, y)
+        _set_slots_region(self, None)
+
+    @property
+    def region(self):
+        """
+        Return and cache (if not already cached) the region self is in.
+        """
+
+        if (self._region is None):
+            _set_slots_region(self, AbstractPoint.region.fget(self))
+        return self._region
+
+    def __reduce__(self):
+        """
+        Return how to rebuild self for copy and pickle. Their default
+        restores the slots with setattr(), which the frozen __setattr__
+        doesn't allow, so self is rebuilt with the constructor instead.
+        """
+
+        return (self.__class__, (self.x, self.y))
+
+_set_slots_region = FrozenSlotsPoint._region.__set__
+
+class MutableSlotsPoint(AbstractSlotsPoint):
+    """
+    A MutablePoint with __slots__. It reuses MutablePoint's methods so it
+    can set x and y and do in-place arithmetic, but it can't get new
+    attributes since it has no __dict__.
+    """
+
+    __slots__ = ()
+
+    __setattr__ = MutablePoint.__setattr__
+    __delattr__ = MutablePoint.__delattr__
+    __iadd__ = MutablePoint.__iadd__
+    __isub__ = MutablePoint.__isub__
+    __imul__ = MutablePoint.__imul__
+    __itruediv__ = MutablePoint.__itruediv__
+    __ifloordiv__ = MutablePoint.__ifloordiv__
+
+"""
+AbstractPoint.Region values as globals for PointArray._region_value(),
+which looks them up once per point.
+"""
+_ORIGIN = AbstractPoint.Region.ORIGIN.value
+_POSITIVE_X = AbstractPoint.Region.POSITIVE_X.value
+_NEGATIVE_X = AbstractPoint.Region.NEGATIVE_X.value
+_POSITIVE_Y = AbstractPoint.Region.POSITIVE_Y.value
+_NEGATIVE_Y = AbstractPoint.Region.NEGATIVE_Y.value
+_QUADRANT1 = AbstractPoint.Region.QUADRANT1.value
+_QUADRANT2 = AbstractPoint.Region.QUADRANT2.value
+_QUADRANT3 = AbstractPoint.Region.QUADRANT3.value
+_QUADRANT4 = AbstractPoint.Region.QUADRANT4.value
+
+class PointArray:
+    """
+    A struct of arrays of 2-dimensional points. The x's and the y's are
+    kept in two contiguous array('d') (or memoryviews of them), instead
+    of one AbstractPoint object per point, so a point costs 16 bytes
+    instead of over 100 bytes.
+
+    The operations work on whole columns with map() over operator and
+    math functions, so the loop over the points runs in C and no point
+    objects are made. A point object (of point_class) is only made when
+    a single point is accessed with [i] or iteration.
+
+    Slicing returns a PointArray view that shares the memory of the
+    columns (memoryview slices), so it is O(1). While a view exists the
+    underlying arrays can't be resized, like any exported buffer.
+    """
+
+    point_class = FrozenSlotsPoint
+
+    def __init__(self, x=(), y=()):
+        """
+        Create a PointArray with columns x and y. An array('d') or a
+        memoryview of doubles is used without copying, anything else is
+        copied into a new array('d').
+        """
+
+        self._x = self._as_column(x)
+        self._y = self._as_column(y)
+        if (len(self._x) != len(self._y)):
+            raise ValueError("x and y must have the same length.")
+
+    @staticmethod
+    def _as_column(values):
+        if (isinstance(values, memoryview) and values.format == 'd'):
+            return values
+        if (not (isinstance(values, array.array) and values.typecode == 'd')):
+            values = array.array('d', values)
+        return memoryview(values)
+
+    @classmethod
+    def from_points(cls, points):
+        """
+        Return a PointArray of points (anything with x and y).
+        """
+
+        x = array.array('d')
+        y = array.array('d')
+        for point in points:
+            x.append(point.x)
+            y.append(point.y)
+        return cls(x, y)
+
+    @property
+    def x(self):
+        """
+        Return the x column as a memoryview, without copying it.
+        """
+
+        return self._x
+
+    @property
+    def y(self):
+        """
+        Return the y column as a memoryview, without copying it.
+        """
+
+        return self._y
+
+    def __len__(self):
+        return len(self._x)
+
+    def __getitem__(self, i):
+        """
+        Return point i as a point_class, or a PointArray view for a slice.
+        """
+
+        if (isinstance(i, slice)):
+            return self.__class__(self._x[i], self._y[i])
+        return self.point_class(self._x[i], self._y[i])
+
+    def __iter__(self):
+        return map(self.point_class, self._x, self._y)
+
+    def __eq__(self, other):
+        if (not isinstance(other, PointArray)):
+            return NotImplemented
+        return (self._x == other._x) and (self._y == other._y)
+
+    def _columns(self, other):
+        """
+        Return the x and y columns of other to use with self's columns.
+        A single point is repeated for every point of self.
+        """
+
+        if (isinstance(other, PointArray)):
+            if (len(other) != len(self)):
+                raise ValueError("PointArrays must have the same length.")
+            return other._x, other._y
+        return itertools.repeat(other.x), itertools.repeat(other.y)
+
+    def _map(self, function, other_x, other_y):
+        return self.__class__(array.array('d', map(function, self._x, other_x)),
+                              array.array('d', map(function, self._y, other_y)))
+
+    def __add__(self, other):
+        """
+        Return self + other for every point. other is a PointArray of
+        the same length or a single point.
+        """
+
+        return self._map(operator.add, *self._columns(other))
+
+    def __sub__(self, other):
+        """
+        Return self - other for every point. other is a PointArray of
+        the same length or a single point.
+        """
+
+        return self._map(operator.sub, *self._columns(other))
+
+    def scale(self, k):
+        """
+        Return every point multiplied by the scalar k.
+        """
+
+        return self._map(operator.mul, itertools.repeat(k),
+                         itertools.repeat(k))
+
+    def __mul__(self, k):
+        return self.scale(k)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self.scale(-1.0)
+
+    def dot(self, other):
+        """
+        Return an array('d') with the dot product of every point and
+        other. other is a PointArray of the same length or a single point.
+        """
+
+        other_x, other_y = self._columns(other)
+        return array.array('d', map(operator.add,
+                                    map(operator.mul, self._x, other_x),
+                                    map(operator.mul, self._y, other_y)))
+
+    def norm(self):
+        """
+        Return an array('d') with the norm of every point.
+        """
+
+        return array.array('d', map(math.hypot, self._x, self._y))
+
+    @staticmethod
+    def _region_value(x, y):
+        """
+        Return the Region.value of point (x, y), with the same branches as
+        AbstractPoint.region. Mapping this over the columns is faster than
+        sign arithmetic with map(), since each point takes 2 comparisons.
+        """
+
+        if (x > 0):
+            if (y > 0):
+                return _QUADRANT1
+            elif (y == 0):
+                return _POSITIVE_X
+            else: # y < 0
+                return _QUADRANT4
+        elif (x == 0):
+            if (y > 0):
+                return _POSITIVE_Y
+            elif (y == 0):
+                return _ORIGIN
+            else: # y < 0
+                return _NEGATIVE_Y
+        else: # x < 0
+            if (y > 0):
+                return _QUADRANT2
+            elif (y == 0):
+                return _NEGATIVE_X
+            else: # y < 0
+                return _QUADRANT3
+
+    def region_values(self):
+        """
+        Return a bytes with the AbstractPoint.Region value of each
+        point's region, the same as AbstractPoint.region.
+        """
+
+        return bytes(map(self._region_value, self._x, self._y))
+
+    def regions(self):
+        """
+        Return a list with the AbstractPoint.Region of each point.
+        """
+
+        return list(map(AbstractPoint.Region, self.region_values()))
+
+    def __repr__(self):
+        return "{}(x={!r}, y={!r})".format(self.__class__.__name__,
+                                           self._x.tolist(), self._y.tolist())
+
 class Rectangle:
     """
     An x-y aligned rectangle on the Cartesian coordinates.
@@ -1111,6 +2803,381 @@ class Rectangle:
 
         return (vector_01 == vector_32) or vector_01.is_close(vector_32)
 
+"""
+RectangleArray.intersects_matrix() compares this many rectangles of
+other at a time.
+"""
+RECTANGLE_BLOCK_SIZE = 1 << 6
+
+class RectangleArray:
+    """
+    A struct of arrays of x-y aligned rectangles, like PointArray. Each
+    rectangle is kept as x0, y0 (lower-left point) and x1, y1 (upper-right
+    point) in four array('d') columns, so comparing rectangles doesn't
+    have to build upper_right_point like Rectangle.intersects() does.
+
+    A Rectangle is only made when a single rectangle is accessed with [i]
+    or iteration. A row with x1 < x0 or y1 < y0 is empty and is accessed
+    as None, which is what intersection_many() gives rectangles that
+    don't intersect, like Rectangle.intersection().
+    """
+
+    def __init__(self, x0=(), y0=(), x1=(), y1=()):
+        """
+        Create a RectangleArray with columns x0, y0, x1 and y1. An
+        array('d') or a memoryview of doubles is used without copying,
+        anything else is copied into a new array('d').
+        """
+
+        self._x0 = PointArray._as_column(x0)
+        self._y0 = PointArray._as_column(y0)
+        self._x1 = PointArray._as_column(x1)
+        self._y1 = PointArray._as_column(y1)
+        if (not (len(self._x0) == len(self._y0) == len(self._x1)
+                 == len(self._y1))):
+            raise ValueError("x0, y0, x1 and y1 must have the same length.")
+
+    @classmethod
+    def from_rectangles(cls, rectangles):
+        """
+        Return a RectangleArray of rectangles.
+        """
+
+        x0 = array.array('d')
+        y0 = array.array('d')
+        x1 = array.array('d')
+        y1 = array.array('d')
+        for rectangle in rectangles:
+            point = rectangle.lower_left_point
+            x0.append(point.x)
+            y0.append(point.y)
+            x1.append(point.x + rectangle.width)
+            y1.append(point.y + rectangle.height)
+        return cls(x0, y0, x1, y1)
+
+    @classmethod
+    def as_rectangle_array(cls, rectangles):
+        """
+        Return rectangles as a RectangleArray. If it already is one, it is
+        returned as is, without a copy.
+        """
+
+        if (isinstance(rectangles, RectangleArray)):
+            return rectangles
+        return cls.from_rectangles(rectangles)
+
+    @property
+    def x0(self):
+        return self._x0
+
+    @property
+    def y0(self):
+        return self._y0
+
+    @property
+    def x1(self):
+        return self._x1
+
+    @property
+    def y1(self):
+        return self._y1
+
+    def __len__(self):
+        return len(self._x0)
+
+    @staticmethod
+    def _rectangle(x0, y0, x1, y1):
+        """
+        Return the Rectangle from (x0, y0) to (x1, y1), or None if it is
+        empty.
+        """
+
+        if ((x1 < x0) or (y1 < y0)):
+            return None
+        return Rectangle(FrozenPoint(x0, y0), x1 - x0, y1 - y0)
+
+    def __getitem__(self, i):
+        """
+        Return rectangle i as a Rectangle (None if it is empty), or a
+        RectangleArray view for a slice.
+        """
+
+        if (isinstance(i, slice)):
+            return self.__class__(self._x0[i], self._y0[i],
+                                  self._x1[i], self._y1[i])
+        return self._rectangle(self._x0[i], self._y0[i],
+                               self._x1[i], self._y1[i])
+
+    def __iter__(self):
+        return map(self._rectangle, self._x0, self._y0, self._x1, self._y1)
+
+    def __eq__(self, other):
+        if (not isinstance(other, RectangleArray)):
+            return NotImplemented
+        return (self._x0 == other._x0) and (self._y0 == other._y0) and \
+               (self._x1 == other._x1) and (self._y1 == other._y1)
+
+    def _columns(self, other):
+        """
+        Return the x0, y0, x1 and y1 columns of other to use with self's
+        columns. A single Rectangle is repeated for every rectangle of
+        self.
+        """
+
+        if (isinstance(other, RectangleArray)):
+            if (len(other) != len(self)):
+                raise ValueError("RectangleArrays must have the same length.")
+            return other._x0, other._y0, other._x1, other._y1
+        point = other.lower_left_point
+        return (itertools.repeat(point.x), itertools.repeat(point.y),
+                itertools.repeat(point.x + other.width),
+                itertools.repeat(point.y + other.height))
+
+    @staticmethod
+    def _intersects(x0, y0, x1, y1, other_x0, other_y0, other_x1, other_y1):
+        """
+        Return a bytes with 1 where the rectangles in the columns
+        intersect, else 0. This is Rectangle.intersects() with map().
+        """
+
+        ge = operator.ge
+        and_ = operator.and_
+        return bytes(map(and_,
+                         map(and_, map(ge, x1, other_x0),
+                             map(ge, other_x1, x0)),
+                         map(and_, map(ge, y1, other_y0),
+                             map(ge, other_y1, y0))))
+
+    def intersects_many(self, other):
+        """
+        Return a bytes with 1 where self[i] intersects with other[i],
+        else 0. other is a RectangleArray of the same length or a single
+        Rectangle to compare with every rectangle of self. Like
+        Rectangle.intersects(), touching by a line or a point counts.
+        """
+
+        return self._intersects(self._x0, self._y0, self._x1, self._y1,
+                                *self._columns(other))
+
+    def intersection_many(self, other):
+        """
+        Return a RectangleArray of the intersection of self[i] and
+        other[i]. other is a RectangleArray of the same length or a
+        single Rectangle.
+
+        Like Rectangle.intersection(), the intersection is max of the x0's
+        and y0's to the min of the x1's and y1's. Rectangles that don't
+        intersect end up with x1 < x0 or y1 < y0, so they are accessed as
+        None.
+        """
+
+        other_x0, other_y0, other_x1, other_y1 = self._columns(other)
+        return self.__class__(
+                array.array('d', map(max, self._x0, other_x0)),
+                array.array('d', map(max, self._y0, other_y0)),
+                array.array('d', map(min, self._x1, other_x1)),
+                array.array('d', map(min, self._y1, other_y1)))
+
+    def bounding_box(self):
+        """
+        Return the smallest Rectangle containing every rectangle of self,
+        or None if self is empty.
+        """
+
+        if (not len(self)):
+            return None
+        return self._rectangle(min(self._x0), min(self._y0),
+                               max(self._x1), max(self._y1))
+
+    def take(self, indices):
+        """
+        Return a new RectangleArray of self[i] for each i in indices.
+        """
+
+        return self.__class__(*(array.array('d', map(column.__getitem__,
+                                                     indices))
+                                for column in (self._x0, self._y0,
+                                               self._x1, self._y1)))
+
+    def intersects_matrix(self, other, block_size=RECTANGLE_BLOCK_SIZE):
+        """
+        Return a list with a bytearray for each rectangle of self, where
+        answer[i][j] is 1 if self[i] intersects with other[j], else 0.
+
+        other is sorted by x0 and compared block_size rectangles at a
+        time. Only the rectangles of self that intersect the bounding box
+        of a block can intersect a rectangle in it, so the rest of self
+        skips the block and their row stays 0. Sorting keeps the bounding
+        boxes narrow in x, so most of self skips most of the blocks when
+        the rectangles are spread out. The rows are put back in the order
+        of other at the end.
+        """
+
+        other = self.as_rectangle_array(other)
+        order = sorted(range(len(other)), key=other._x0.__getitem__)
+        sorted_other = other.take(order)
+        answer = [bytearray(len(other)) for _ in range(len(self))]
+        for start in range(0, len(other), block_size):
+            block = sorted_other[start:start + block_size]
+            stop = start + len(block)
+            candidates = self.intersects_many(block.bounding_box())
+            for i in itertools.compress(range(len(self)), candidates):
+                answer[i][start:stop] = self._intersects(
+                        itertools.repeat(self._x0[i]),
+                        itertools.repeat(self._y0[i]),
+                        itertools.repeat(self._x1[i]),
+                        itertools.repeat(self._y1[i]),
+                        block._x0, block._y0, block._x1, block._y1)
+
+        inverse = [0] * len(order)
+        for (j, i) in enumerate(order):
+            inverse[i] = j
+        return [bytearray(map(row.__getitem__, inverse)) if any(row) else row
+                for row in answer]
+
+    def __repr__(self):
+        repr_string = "{}(x0={!r}, y0={!r}, x1={!r}, y1={!r})"
+        return repr_string.format(self.__class__.__name__,
+                                  self._x0.tolist(), self._y0.tolist(),
+                                  self._x1.tolist(), self._y1.tolist())
+
+class _ActiveIntervals:
+    """
+    The active set of find_intersecting_pairs(). It holds the y
+    intervals [i0, i1] of rectangles, as indices into the sorted y
+    coordinates, and reports the ones overlapping an interval in
+    O(log N + K).
+
+    It is a segment tree over the y coordinates, stored in lists with the
+    children of node n at 2n and 2n + 1 and the leaves from size on.
+    An interval [i0, i1] overlaps [j0, j1] iff it contains j0, or it
+    starts in (j0, j1]. Those are two disjoint cases, so every overlap is
+    reported once:
+    1. covering[n] holds the intervals that cover node n's range but not
+       its parent's. An interval is in O(log N) of these, and the ones
+       containing j0 are in the covering sets on the path from leaf j0
+       to the root.
+    2. starting[i] holds the intervals starting at i, and counts[n] is
+       how many intervals start under node n, so the search for starts
+       in (j0, j1] only goes down into nodes with something in them.
+    """
+
+    def __init__(self, num_coordinates):
+        self.size = 1 << max(num_coordinates - 1, 0).bit_length()
+        self.covering = [set() for _ in range(2 * self.size)]
+        self.starting = [set() for _ in range(self.size)]
+        self.counts = [0] * (2 * self.size)
+
+    def _nodes(self, i0, i1):
+        """
+        Return the fewest nodes whose ranges together are exactly
+        [i0, i1].
+        """
+
+        nodes = []
+        lo = i0 + self.size
+        hi = i1 + 1 + self.size
+        while (lo < hi):
+            if (lo & 1):
+                nodes.append(lo)
+                lo += 1
+            if (hi & 1):
+                hi -= 1
+                nodes.append(hi)
+            lo >>= 1
+            hi >>= 1
+        return nodes
+
+    def _update(self, key, i0, i1, add):
+        for node in self._nodes(i0, i1):
+            if (add):
+                self.covering[node].add(key)
+            else:
+                self.covering[node].discard(key)
+        if (add):
+            self.starting[i0].add(key)
+        else:
+            self.starting[i0].discard(key)
+        change = 1 if add else -1
+        node = i0 + self.size
+        while (node):
+            self.counts[node] += change
+            node >>= 1
+
+    def add(self, key, i0, i1):
+        self._update(key, i0, i1, True)
+
+    def remove(self, key, i0, i1):
+        self._update(key, i0, i1, False)
+
+    def overlapping(self, j0, j1):
+        """
+        Yield the key of every interval overlapping [j0, j1].
+        """
+
+        node = j0 + self.size
+        while (node):
+            yield from self.covering[node]
+            node >>= 1
+
+        if (j0 < j1):
+            stack = [node for node in self._nodes(j0 + 1, j1)
+                     if self.counts[node]]
+            while (stack):
+                node = stack.pop()
+                if (node >= self.size):
+                    yield from self.starting[node - self.size]
+                else:
+                    for child in (2 * node, 2 * node + 1):
+                        if (self.counts[child]):
+                            stack.append(child)
+
+def find_intersecting_pairs(rectangles):
+    """
+    Return a list of every pair (i, j), i < j, where rectangles[i]
+    intersects with rectangles[j]. rectangles is a RectangleArray or a
+    sequence of Rectangles. Like Rectangle.intersects(), rectangles
+    touching by a line or a point (0 area) intersect.
+
+    This sweeps a vertical line across x. A rectangle is added to the
+    active set at x0 and removed at x1, and the active rectangles are
+    the ones the line crosses. Two rectangles intersect iff their x
+    ranges overlap and their y ranges overlap. When a rectangle is
+    added, the active rectangles are the ones whose x range overlaps its
+    x0, so it intersects the active rectangles whose y range overlaps its
+    own. At the same x, additions go before removals so touching x
+    ranges overlap.
+
+    The active set is an _ActiveIntervals over the sorted y coordinates,
+    so this is O((N + K) log N) for N rectangles and K pairs, instead of
+    O(N^2) for comparing every pair.
+    """
+
+    rectangles = RectangleArray.as_rectangle_array(rectangles)
+    y_coordinates = sorted(set(rectangles.y0).union(rectangles.y1))
+    y_indices = {y: i for (i, y) in enumerate(y_coordinates)}
+    i0s = list(map(y_indices.__getitem__, rectangles.y0))
+    i1s = list(map(y_indices.__getitem__, rectangles.y1))
+
+    ADD = 0
+    REMOVE = 1
+    events = sorted(itertools.chain(
+            zip(rectangles.x0, itertools.repeat(ADD), itertools.count()),
+            zip(rectangles.x1, itertools.repeat(REMOVE), itertools.count())))
+
+    active = _ActiveIntervals(len(y_coordinates))
+    answer = []
+    for (_, event, i) in events:
+        i0 = i0s[i]
+        i1 = i1s[i]
+        if (event == ADD):
+            for j in active.overlapping(i0, i1):
+                answer.append((j, i) if j < i else (i, j))
+            active.add(i, i0, i1)
+        else: # event == REMOVE
+            active.remove(i, i0, i1)
+    return answer
+
 class ThreeDimensionalPoint:
     """
     A 3-dimensional point on the Cartesian coordinates.
@@ -0,0 +1,349 @@
+"""
+A static R-tree over mathextra.Rectangle for window, point and nearest
+queries against a fixed set of rectangles.
+
+The tree is bulk-loaded with Sort-Tile-Recursive (STR) packing: the
+rectangles are sorted by the x of their centers and cut into about
+sqrt(N / node_capacity) vertical slices, each slice is sorted by the y of
+the centers, and every node_capacity rectangles in a row become a leaf.
+The leaves are packed the same way into the level above, and so on up to
+the root. Every node is full except the last of each level, and nearby
+rectangles end up in the same nodes, so a query only visits the few
+nodes whose bounding boxes it overlaps.
+
+The nodes aren't objects. They are rows of contiguous arrays:
+- boxes is a mathextra.RectangleArray of every node's bounding box, root
+  first and level by level down, followed by the rectangles themselves
+  (the entries) in packed order.
+- children holds (start, stop) for every node, the range of rows of boxes
+  that are its children. Nodes of a level have their children next to
+  each other in the level below, so this is a range instead of a list.
+- ids holds the index in the original rectangles of every entry.
+
+Since it is only arrays, the tree can be saved as a flat buffer (a
+header followed by the arrays) and memory-mapped with load(), so many
+worker processes share the same pages without rebuilding the tree.
+"""
+
+from epi.utils import mathextra
+from array import array
+import heapq, itertools, math, mmap, struct, sys
+
+"""
+The most children a node of RTree has, unless given.
+"""
+RTREE_NODE_CAPACITY = 16
+
+class RTree:
+    """
+    A static R-tree of rectangles bulk-loaded with STR packing. See the
+    module docstring for the layout.
+    """
+
+    _FILE_MAGIC = b"EPIRTREE"
+    _FILE_HEADER = struct.Struct("<8sQQQ")
+    # typecodes of the arrays after the header, in the order of _sections()
+    _SECTION_TYPECODES = "ddddqq"
+
+    def __init__(self, rectangles=(), node_capacity=RTREE_NODE_CAPACITY):
+        """
+        Create an RTree of rectangles, a mathextra.RectangleArray or a
+        sequence of mathextra.Rectangles. Queries return indices into
+        rectangles.
+        """
+
+        if (node_capacity < 2):
+            raise ValueError("node_capacity must be >= 2.")
+
+        entries = mathextra.RectangleArray.as_rectangle_array(rectangles)
+        levels = []
+        level = ([list(column) for column in (entries.x0, entries.y0,
+                                              entries.x1, entries.y1)],
+                 list(range(len(entries))))
+        while (level[1]):
+            columns, payload = level
+            order = self._str_order(columns, node_capacity)
+            columns = [list(map(column.__getitem__, order))
+                       for column in columns]
+            payload = list(map(payload.__getitem__, order))
+            levels.append((columns, payload))
+
+            x0s, y0s, x1s, y1s = columns
+            parent_columns = [[], [], [], []]
+            parent_children = []
+            for start in range(0, len(payload), node_capacity):
+                stop = min(start + node_capacity, len(payload))
+                parent_columns[0].append(min(x0s[start:stop]))
+                parent_columns[1].append(min(y0s[start:stop]))
+                parent_columns[2].append(max(x1s[start:stop]))
+                parent_columns[3].append(max(y1s[start:stop]))
+                parent_children.append((start, stop))
+            if (len(parent_children) == 1):
+                levels.append((parent_columns, parent_children))
+                break
+            level = (parent_columns, parent_children)
+
+        # levels is from the entries up to the root. Lay it out from the
+        # root down, with the children ranges moved to the rows of the
+        # level below.
+        levels.reverse()
+        columns = [array('d') for _ in range(4)]
+        children = array('q')
+        offset = 0
+        for (level_columns, payload) in levels[:-1]:
+            child_offset = offset + len(payload)
+            for (column, level_column) in zip(columns, level_columns):
+                column.extend(level_column)
+            for (start, stop) in payload:
+                children.append(child_offset + start)
+                children.append(child_offset + stop)
+            offset = child_offset
+        ids = array('q')
+        if (levels):
+            level_columns, payload = levels[-1]
+            for (column, level_column) in zip(columns, level_columns):
+                column.extend(level_column)
+            ids.extend(payload)
+
+        self._set_arrays(node_capacity, mathextra.RectangleArray(*columns),
+                         children, ids)
+        self._mmap = None
+
+    @staticmethod
+    def _str_order(columns, node_capacity):
+        """
+        Return the indices of the boxes in columns in STR order: sorted
+        by the x of the centers in slices of slice_count * node_capacity,
+        each slice sorted by the y of the centers. x0 + x1 is twice the x
+        of the center, which sorts the same.
+        """
+
+        x0s, y0s, x1s, y1s = columns
+        n = len(x0s)
+        leaf_count = -(-n // node_capacity)
+        slice_count = math.ceil(math.sqrt(leaf_count))
+        slice_size = slice_count * node_capacity
+
+        x_centers = list(map(float.__add__, x0s, x1s))
+        y_centers = list(map(float.__add__, y0s, y1s))
+        order = sorted(range(n), key=x_centers.__getitem__)
+        for start in range(0, n, slice_size):
+            order[start:start + slice_size] = sorted(
+                    order[start:start + slice_size],
+                    key=y_centers.__getitem__)
+        return order
+
+    def _set_arrays(self, node_capacity, boxes, children, ids):
+        self._node_capacity = node_capacity
+        self._boxes = boxes
+        self._children = children
+        self._ids = ids
+        self._num_nodes = len(children) // 2
+
+    @property
+    def node_capacity(self):
+        return self._node_capacity
+
+    @property
+    def num_nodes(self):
+        """
+        Return the number of nodes, leaves included.
+        """
+
+        return self._num_nodes
+
+    def __len__(self):
+        """
+        Return the number of rectangles.
+        """
+
+        return len(self._ids)
+
+    def _search(self, window):
+        """
+        Return the indices of the rectangles intersecting the Rectangle
+        window. Each node tests all of its children at once with
+        RectangleArray.intersects_many() on a view of boxes.
+        """
+
+        if (not self._num_nodes):
+            return []
+
+        boxes = self._boxes
+        children = self._children
+        ids = self._ids
+        num_nodes = self._num_nodes
+        answer = []
+        stack = [0]
+        while (stack):
+            node = stack.pop()
+            start = children[2 * node]
+            stop = children[2 * node + 1]
+            hits = boxes[start:stop].intersects_many(window)
+            if (start >= num_nodes):
+                answer.extend(itertools.compress(
+                        ids[start - num_nodes:stop - num_nodes], hits))
+            else:
+                stack.extend(itertools.compress(range(start, stop), hits))
+        return answer
+
+    def query_window(self, rectangle):
+        """
+        Return the indices of the rectangles that intersect rectangle.
+        Like mathextra.Rectangle.intersects(), touching by a line or a
+        point counts.
+        """
+
+        return self._search(rectangle)
+
+    def query_point(self, point):
+        """
+        Return the indices of the rectangles that contain point, borders
+        included.
+        """
+
+        return self._search(mathextra.Rectangle(point, 0, 0))
+
+    def _distance(self, i, x, y):
+        """
+        Return the distance from (x, y) to the closest point of box i,
+        which is 0 if (x, y) is inside it.
+        """
+
+        boxes = self._boxes
+        dx = max(boxes.x0[i] - x, 0.0, x - boxes.x1[i])
+        dy = max(boxes.y0[i] - y, 0.0, y - boxes.y1[i])
+        return math.hypot(dx, dy)
+
+    def query_nearest(self, point, k=1):
+        """
+        Return the indices of the k rectangles closest to point, closest
+        first. The distance to a rectangle is the distance to its closest
+        point, so rectangles containing point are at 0.
+
+        This is a best-first search. The heap holds nodes and rectangles
+        by their distance, and a node's box is never farther than
+        anything inside it, so rectangles come off the heap in order of
+        distance and the search stops after k of them.
+        """
+
+        if (not self._num_nodes):
+            return []
+
+        x = point.x
+        y = point.y
+        children = self._children
+        num_nodes = self._num_nodes
+        answer = []
+        heap = [(self._distance(0, x, y), 0)]
+        while (heap and (len(answer) < k)):
+            _, i = heapq.heappop(heap)
+            if (i >= num_nodes):
+                answer.append(self._ids[i - num_nodes])
+            else:
+                for child in range(children[2 * i], children[2 * i + 1]):
+                    heapq.heappush(heap, (self._distance(child, x, y), child))
+        return answer
+
+    def _sections(self):
+        """
+        Return the arrays written after the header, in order.
+        """
+
+        boxes = self._boxes
+        return [boxes.x0, boxes.y0, boxes.x1, boxes.y1, self._children,
+                self._ids]
+
+    def to_bytes(self):
+        """
+        Return the tree as a flat buffer: a header followed by the x0,
+        y0, x1 and y1 columns of boxes, children and ids, all 8-byte
+        little-endian values.
+        """
+
+        header = self._FILE_HEADER.pack(self._FILE_MAGIC,
+                                        self._node_capacity, self._num_nodes,
+                                        len(self))
+        sections = []
+        for (typecode, section) in zip(self._SECTION_TYPECODES,
+                                       self._sections()):
+            section = array(typecode, section)
+            if (sys.byteorder == "big"):
+                section.byteswap()
+            sections.append(section.tobytes())
+        return header + b"".join(sections)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Return the RTree saved in buffer by to_bytes(). The arrays are
+        memoryviews of buffer, not copies, so buffer can be a mmap shared
+        by many processes. On a big-endian machine they are copied to
+        swap the byte order.
+        """
+
+        magic, node_capacity, num_nodes, num_entries = \
+            cls._FILE_HEADER.unpack_from(buffer)
+        if (magic != cls._FILE_MAGIC):
+            raise ValueError("buffer is not an RTree")
+
+        view = memoryview(buffer)
+
+        num_boxes = num_nodes + num_entries
+        sections = []
+        offset = cls._FILE_HEADER.size
+        lengths = [num_boxes] * 4 + [2 * num_nodes, num_entries]
+        for (typecode, length) in zip(cls._SECTION_TYPECODES, lengths):
+            size = length * 8
+            section = view[offset:offset + size].cast(typecode)
+            if (sys.byteorder == "big"):
+                section = array(typecode, section)
+                section.byteswap()
+            sections.append(section)
+            offset += size
+
+        tree = cls.__new__(cls)
+        tree._set_arrays(node_capacity,
+                         mathextra.RectangleArray(*sections[:4]),
+                         sections[4], sections[5])
+        tree._mmap = None
+        return tree
+
+    def save(self, path):
+        """
+        Save the tree to path as to_bytes().
+        """
+
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Return the RTree saved at path. The file is memory-mapped
+        read-only, so nothing is read until it is queried. Call close()
+        when done with it.
+        """
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            tree = cls.from_buffer(mapped)
+        except ValueError:
+            mapped.close()
+            raise ValueError("{!r} is not an RTree file".format(path))
+        tree._mmap = mapped
+        return tree
+
+    def close(self):
+        """
+        Release the memory-mapped file of a loaded tree, if any. The tree
+        can't be queried after.
+        """
+
+        if (self._mmap is not None):
+            for section in self._sections():
+                if (isinstance(section, memoryview)):
+                    section.release()
+            self._mmap.close()
+        self._mmap = None